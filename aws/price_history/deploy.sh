@@ -27,13 +27,13 @@ echo "S3 Bucket: $S3_BUCKET"
 echo "Function Name: $FUNCTION_NAME"
 echo "========================================="
 
-# Navigate to aws/zillow directory
-cd "$(dirname "$0")"
+# Navigate to the repository root, which the image copies crawler/ from
+cd "$(dirname "$0")/../.."
 echo "Building from: $(pwd)"
 
-# Build Docker image (context is current directory)
+# Build Docker image (context is the repository root)
 echo "Building Docker image..."
-docker build -t $IMAGE_NAME .
+docker build -t $IMAGE_NAME -f aws/price_history/Dockerfile .
 
 # Create ECR repository if it doesn't exist
 echo "Checking ECR repository..."
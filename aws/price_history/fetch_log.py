@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Set, Tuple
+
+from crawler import aws_clients
+
+# Seconds after a fetch during which a zpid is skipped unless forced (0 disables skipping)
+PRICE_HISTORY_FRESH_TTL = float(os.getenv("PRICE_HISTORY_FRESH_TTL", str(7 * 24 * 3600)))
+# zpids whose last fetch is remembered in memory across warm invocations
+PRICE_HISTORY_FETCH_LOG_CACHE_SIZE = int(os.getenv("PRICE_HISTORY_FETCH_LOG_CACHE_SIZE", "10000"))
+
+
+class FetchLog:
+    """
+    Freshness index of price history fetches: when each zpid was last fetched.
+
+    The price_history_fetch_log table is the source of truth, shared by every
+    Lambda instance; an LRU of up to max_size entries in front of it answers
+    repeats within a warm instance without a query. Only "fresh" answers are
+    taken from memory, since another instance may have fetched a zpid since,
+    so everything else is looked up in one query per batch. Lookup failures
+    are treated as "not fresh": the cost is a redundant fetch, never a
+    missing history.
+
+    Args:
+        connect: Returns a warm psycopg2 connection
+        ttl: Seconds a fetch stays fresh
+        max_size: Entries kept in memory
+
+    Example:
+        fresh = FETCH_LOG.fresh(zpids)
+        ...
+        FETCH_LOG.record({zpid: len(records) for zpid, records in saved.items()})
+    """
+
+    def __init__(self, connect: Callable, ttl: float = PRICE_HISTORY_FRESH_TTL, max_size: int = PRICE_HISTORY_FETCH_LOG_CACHE_SIZE):
+        self._connect = connect
+        self.ttl = ttl
+        self.max_size = max_size
+        self.memory_hits = 0
+        self.lookups = 0
+        self._entries: "OrderedDict[int, Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, zpid: int, fetched_at: float, event_count: int):
+        with self._lock:
+            self._entries[zpid] = (fetched_at, event_count)
+            self._entries.move_to_end(zpid)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def fresh(self, zpids: Iterable[int], now: float = None) -> Set[int]:
+        """The zpids fetched less than ttl seconds ago"""
+        if self.ttl <= 0:
+            return set()
+        now = time.time() if now is None else now
+        fresh = set()
+        unknown = []
+        with self._lock:
+            for zpid in zpids:
+                entry = self._entries.get(zpid)
+                if entry is not None and now - entry[0] < self.ttl:
+                    self._entries.move_to_end(zpid)
+                    self.memory_hits += 1
+                    fresh.add(zpid)
+                else:
+                    unknown.append(zpid)
+        if not unknown:
+            return fresh
+
+        try:
+            conn = self._connect()
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT zpid, EXTRACT(EPOCH FROM fetched_at), event_count
+                    FROM price_history_fetch_log WHERE zpid = ANY(%s)
+                    """,
+                    (unknown,),
+                )
+                rows = cur.fetchall()
+            conn.rollback()
+            self.lookups += 1
+        except Exception as e:
+            print(f"Error reading price history fetch log: {e}")
+            return fresh
+
+        for zpid, fetched_at, event_count in rows:
+            fetched_at = float(fetched_at)
+            self._remember(zpid, fetched_at, event_count)
+            if now - fetched_at < self.ttl:
+                fresh.add(zpid)
+        return fresh
+
+    def record(self, event_counts: Dict[int, int], now: float = None):
+        """
+        Log that each zpid was just fetched with event_counts[zpid] records.
+
+        Only pass zpids whose response carried the property: anything
+        recorded here is skipped for ttl seconds.
+        """
+        if not event_counts:
+            return
+        from psycopg2.extras import execute_values
+
+        now = time.time() if now is None else now
+        conn = self._connect()
+        try:
+            with conn.cursor() as cur:
+                execute_values(
+                    cur,
+                    """
+                    INSERT INTO price_history_fetch_log (zpid, fetched_at, event_count) VALUES %s
+                    ON CONFLICT (zpid) DO UPDATE
+                    SET fetched_at = EXCLUDED.fetched_at, event_count = EXCLUDED.event_count
+                    """,
+                    [(zpid, now, count) for zpid, count in event_counts.items()],
+                    template="(%s, to_timestamp(%s), %s)",
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        for zpid, count in event_counts.items():
+            self._remember(zpid, now, count)
+
+    def stats(self) -> Dict[str, int]:
+        """Answers served from memory and database lookups made"""
+        return {"memory_hits": self.memory_hits, "lookups": self.lookups}
+
+
+FETCH_LOG = FetchLog(aws_clients.db_connection)
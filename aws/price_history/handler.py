@@ -1,13 +1,96 @@
 import os
 import json
-from price_history_fetcher import PriceHistoryFetcher
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from fetch_log import FETCH_LOG
+from price_history_fetcher import PRICE_HISTORY_BATCH_SIZE, PriceHistoryFetcher, save_price_histories
+
+# Fetchers working through an SQS batch at once; requests still share one rate limit
+PRICE_HISTORY_WORKERS = int(os.getenv("PRICE_HISTORY_WORKERS", "4"))
+# No new zpid is started once less than this many ms of the invocation remain
+PRICE_HISTORY_TIME_RESERVE_MS = int(os.getenv("PRICE_HISTORY_TIME_RESERVE_MS", "15000"))
+
+
+def _remaining_ms(context) -> float:
+    """Milliseconds left in the invocation (unbounded outside Lambda)"""
+    if context is None or not hasattr(context, 'get_remaining_time_in_millis'):
+        return float('inf')
+    return context.get_remaining_time_in_millis()
+
+
+def _parse_records(records: List[Dict]):
+    """
+    Group SQS records by zpid.
+
+    Returns:
+        (zpid -> message IDs carrying it, zpids sent with "force": true,
+         message IDs that could not be parsed)
+    """
+    message_ids = {}
+    forced = set()
+    unparsable = []
+    for record in records:
+        try:
+            body = json.loads(record['body'])
+            zpid = int(body['zpid'])
+            message_ids.setdefault(zpid, []).append(record['messageId'])
+            if body.get('force'):
+                forced.add(zpid)
+        except Exception as e:
+            print(f"Error parsing message {record.get('messageId')}: {str(e)}")
+            unparsable.append(record.get('messageId'))
+    return message_ids, forced, unparsable
+
+
+def _work(slot: int, pending: deque, lock: threading.Lock, fetched: Dict[int, List[Dict]], outcomes: Dict[int, str], deadline: float, s3_bucket: str, s3_prefix: str):
+    """Fetch zpids off pending, a batch at a time, until it is empty or the deadline passes"""
+    fetcher = PriceHistoryFetcher.pooled(s3_bucket=s3_bucket, s3_prefix=s3_prefix, slot=slot)
+    while time.monotonic() < deadline:
+        # Once Zillow rejects batched documents each request covers one zpid
+        size = PRICE_HISTORY_BATCH_SIZE if fetcher.batches_supported else 1
+        with lock:
+            chunk = [pending.popleft() for _ in range(min(size, len(pending)))]
+        if not chunk:
+            return
+
+        try:
+            histories, unstarted = fetcher.get_price_histories(chunk, deadline=deadline)
+        except Exception as e:
+            print(f"Error fetching zpids {chunk}: {str(e)}")
+            histories, unstarted = {}, []
+
+        if unstarted:
+            # Back to the front of the queue: released if time is up, else another worker's
+            with lock:
+                pending.extendleft(reversed(unstarted))
+        for zpid in chunk:
+            if zpid in histories:
+                fetched[zpid] = histories[zpid]
+            elif zpid not in unstarted:
+                print(f"Error processing zpid {zpid}: price history could not be fetched")
+                outcomes[zpid] = 'failed'
+
+        if fetcher.blocked:
+            # Leave the remaining zpids to the other workers; this session is evicted
+            print(f"Worker {slot} blocked by Zillow, stopping")
+            return
 
 
 def lambda_handler(event, context):
     """
     AWS Lambda handler for fetching price history
 
-    Triggered by SQS messages containing zpid
+    Triggered by SQS messages containing zpid. Records are deduplicated by
+    zpid and fetched by PRICE_HISTORY_WORKERS concurrent fetchers, then
+    the whole batch is saved with one insert on one warm connection.
+    zpids fetched within PRICE_HISTORY_FRESH_TTL (see fetch_log) are
+    skipped unless a message carries "force": true. The event source
+    mapping must enable ReportBatchItemFailures: only the messages listed
+    in batchItemFailures (failed zpids, unparsable bodies and zpids not
+    started before the time reserve) are redelivered.
 
     Environment Variables:
         DB_HOST: Database host
@@ -17,52 +100,100 @@ def lambda_handler(event, context):
         DB_PASSWORD: Database password
         ZILLOW_S3_BUCKET: S3 bucket containing session data (optional)
         ZILLOW_S3_PREFIX: S3 prefix for session data files (optional)
+        PRICE_HISTORY_WORKERS: Concurrent fetchers (default: 4)
+        PRICE_HISTORY_TIME_RESERVE_MS: Time left at which no new zpid is started (default: 15000)
+        PRICE_HISTORY_FRESH_TTL: Seconds after a fetch during which a zpid is skipped (default: 604800)
 
     Args:
         event: SQS event with Records containing zpid
         context: Lambda context object
 
     Returns:
-        dict: Response with statusCode and processing summary
+        dict: SQS partial batch response, {"batchItemFailures": [{"itemIdentifier": message_id}, ...]}
     """
-    # Initialize fetcher with S3 configuration from environment
-    s3_bucket = os.environ.get('ZILLOW_S3_BUCKET')
-    s3_prefix = "session_data"
-    fetcher = PriceHistoryFetcher(s3_bucket=s3_bucket, s3_prefix=s3_prefix)
+    records = event.get('Records', [])
+    try:
+        s3_bucket = os.environ.get('ZILLOW_S3_BUCKET')
+        s3_prefix = "session_data"
 
-    processed = 0
-    failed = 0
+        message_ids, forced, unparsable = _parse_records(records)
+        # zpids fetched within PRICE_HISTORY_FRESH_TTL are acknowledged without a request
+        skipped = FETCH_LOG.fresh(zpid for zpid in message_ids if zpid not in forced)
+        pending = deque(zpid for zpid in message_ids if zpid not in skipped)
+        fetched = {}
+        outcomes = {}
+        lock = threading.Lock()
 
-    try:
-        for record in event['Records']:
+        # No request starts after this point, leaving time to save and report
+        deadline = time.monotonic() + (_remaining_ms(context) - PRICE_HISTORY_TIME_RESERVE_MS) / 1000
+        workers = max(1, min(PRICE_HISTORY_WORKERS, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_work, slot, pending, lock, fetched, outcomes, deadline, s3_bucket, s3_prefix)
+                for slot in range(workers)
+            ]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error in price history worker: {str(e)}")
+
+        # One connection and one insert for everything the workers fetched
+        inserted = {}
+        if fetched:
             try:
-                # Parse message body
-                body = json.loads(record['body'])
-                zpid = body['zpid']
+                inserted = save_price_histories(fetched)
+            except Exception as e:
+                print(f"Error saving price histories: {str(e)}")
+        for zpid in fetched:
+            outcomes[zpid] = 'processed' if zpid in inserted else 'failed'
+        try:
+            # fetched only holds zpids whose response carried the property,
+            # so failed or blocked fetches are never marked fresh
+            FETCH_LOG.record({zpid: len(fetched[zpid]) for zpid in inserted})
+        except Exception as e:
+            print(f"Error recording price history fetches: {str(e)}")
 
-                # Fetch and save price history
-                fetcher.fetch_and_save(zpid)
-                processed += 1
+        processed = [zpid for zpid, outcome in outcomes.items() if outcome == 'processed']
+        failed = [zpid for zpid in message_ids if zpid not in outcomes and zpid not in pending and zpid not in skipped]
+        failed += [zpid for zpid, outcome in outcomes.items() if outcome == 'failed']
+        released = list(pending)
 
-            except Exception as e:
-                print(f"Error processing zpid {zpid}: {str(e)}")
-                failed += 1
-                # Don't raise - continue processing other records
+        failures = list(unparsable)
+        for zpid in failed + released:
+            failures.extend(message_ids[zpid])
 
-        return {
-            'statusCode': 200 if failed == 0 else 207,
-            'body': json.dumps({
-                'message': f'Processed {processed} properties, {failed} failed',
-                'processed': processed,
-                'failed': failed
-            })
+        metrics = {
+            'records': len(records),
+            'duplicates': len(records) - len(unparsable) - len(message_ids),
+            'processed': len(processed),
+            'skipped': len(skipped),
+            'failed': len(failed),
+            'released': len(released),
+            'unparsable': len(unparsable),
         }
+        # CloudWatch embedded metric format: the counts become PriceHistory metrics
+        print(json.dumps({
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': 'PriceHistory',
+                    'Dimensions': [[]],
+                    'Metrics': [{'Name': name, 'Unit': 'Count'} for name in metrics],
+                }],
+            },
+            'message': f'Processed {len(processed)} properties, {len(skipped)} skipped as fresh, {len(failed)} failed, {len(released)} released',
+            **metrics,
+            'inserted': {str(zpid): count for zpid, count in inserted.items()},
+            'fetch_log': FETCH_LOG.stats(),
+        }))
+        return {'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failures if message_id]}
 
     except Exception as e:
+        # Let SQS redeliver the whole batch
         print(f'Error in lambda_handler: {str(e)}')
         return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'error': str(e)
-            })
+            'batchItemFailures': [
+                {'itemIdentifier': record['messageId']} for record in records if record.get('messageId')
+            ]
         }
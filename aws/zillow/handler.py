@@ -8,7 +8,8 @@ def lambda_handler(event, context):
     """
     AWS Lambda handler for Zillow scraper
 
-    Triggered by EventBridge schedule with city-specific payload
+    Triggered by EventBridge, either with a city-specific payload or with no
+    city, in which case every city the scheduler considers due is scraped
 
     Environment Variables:
         ZILLOW_S3_BUCKET: S3 bucket containing session data (required)
@@ -17,7 +18,7 @@ def lambda_handler(event, context):
 
     Event Payload:
         {
-            "city": "Collingswood"  # One of: Collingswood, Haddonfield, Moorestown, Haddon_Township
+            "city": "Collingswood"  # Optional; any enabled city in the registry
         }
 
     Args:
@@ -37,19 +38,22 @@ def lambda_handler(event, context):
         city = event.get('city')
 
         if not city:
-            raise ValueError('Event must contain "city" parameter')
-
-        # Validate city is in the allowed list
-        if city not in Zillow.CITIES:
-            raise ValueError(f'Invalid city: {city}. Must be one of: {", ".join(Zillow.CITIES)}')
+            # Scheduled mode: scrape whichever cities are due
+            summary = Zillow.run_all(s3_bucket=s3_bucket, s3_prefix="session_data", due_only=True)
+            return {
+                'statusCode': 500 if summary['failed'] else 200,
+                'body': json.dumps(summary)
+            }
+
+        # Validate city is in the registry
+        cities = Zillow.registry().cities()
+        if city not in cities:
+            raise ValueError(f'Invalid city: {city}. Must be one of: {", ".join(cities)}')
 
         print(f'Starting Zillow scraper for city: {city}')
 
-        # Create crawler instance for the specific city
-        crawler, search_data = Zillow.for_city(city, s3_bucket=s3_bucket, s3_prefix="session_data")
-
-        # Run the scraper for this city
-        crawler.run(search_data)
+        # Run the scraper for this city and reschedule it
+        Zillow.run_city(city, s3_bucket=s3_bucket, s3_prefix="session_data")
 
         return {
             'statusCode': 200,
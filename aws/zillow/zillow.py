@@ -1,18 +1,57 @@
-import boto3
 import json
 import os
-import psycopg2
-import time
-from typing import Dict, Optional, List
-
+from functools import partial
+from typing import Dict, Optional, List, Tuple
+
+from crawler import aws_clients
+from crawler.city_runner import run_cities
+from crawler.city_scheduler import CityRegistry
+from crawler.concurrency import ZillowBlockDetector, shared_concurrency_controller
+from crawler.rate_limiter import shared_rate_limiter
+from crawler.s3_cache import SESSION_DATA_CACHE
+from crawler.search_planner import ZillowSearchPlanner
+from crawler.session_pool import SESSION_POOL
+from crawler.sqs_publisher import SqsBatchPublisher
+from crawler.sync_state import SYNC_STATE, CitySyncState
 from crawler.simple_crawler import SimpleCrawler
+from crawler.zillow_records import SoldHome, SearchResponse, decode_search_response
+
+# Request budget for zillow.com shared by every Zillow session in the process
+ZILLOW_REQUESTS_PER_SECOND = float(os.getenv("ZILLOW_REQUESTS_PER_SECOND", "0.5"))
+ZILLOW_BURST = float(os.getenv("ZILLOW_BURST", "2"))
+ZILLOW_MAX_CONCURRENCY = int(os.getenv("ZILLOW_MAX_CONCURRENCY", "4"))
+# How many times a city's map may be split into quadrants to fit one page per tile
+ZILLOW_MAX_TILE_DEPTH = int(os.getenv("ZILLOW_MAX_TILE_DEPTH", "6"))
+# Cities run_all scrapes at once, on a "thread" or "process" pool
+ZILLOW_RUN_WORKERS = int(os.getenv("ZILLOW_RUN_WORKERS", "4"))
+ZILLOW_RUN_EXECUTOR = os.getenv("ZILLOW_RUN_EXECUTOR", "thread")
+# Cities to crawl when the registry is file backed (see CityRegistry.from_env)
+ZILLOW_CITIES_CONFIG = os.getenv(
+    "ZILLOW_CITIES_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cities.json")
+)
+# Filter out homes earlier syncs already stored before touching the database
+ZILLOW_INCREMENTAL_SYNC = os.getenv("ZILLOW_INCREMENTAL_SYNC", "true").lower() in ("1", "true", "yes")
 
 
 class Zillow(SimpleCrawler):
-    CITIES = ["Collingswood", "Haddonfield", "Haddon_Township", "Moorestown"]
-
-    def __init__(self, s3_bucket: Optional[str] = None, s3_prefix: Optional[str] = None):
-        super(Zillow, self).__init__()
+    _registry: Optional[CityRegistry] = None
+
+    def __init__(
+        self,
+        s3_bucket: Optional[str] = None,
+        s3_prefix: Optional[str] = None,
+        impersonate: str = "chrome",
+    ):
+        super(Zillow, self).__init__(
+            impersonate=impersonate,
+            rate_limiter=shared_rate_limiter("zillow", ZILLOW_REQUESTS_PER_SECOND, ZILLOW_BURST),
+            concurrency_controller=shared_concurrency_controller(
+                "zillow",
+                initial_concurrency=1,
+                max_concurrency=ZILLOW_MAX_CONCURRENCY,
+                block_detector=ZillowBlockDetector(),
+            ),
+        )
         self.headers.update({
             'accept': '*/*',
             'accept-language': 'en-US,en;q=0.9',
@@ -22,71 +61,80 @@ class Zillow(SimpleCrawler):
             'referer': 'https://www.zillow.com',
         })
         self.city = ""
+        self.search_data: Optional[Dict] = None
         self.s3_bucket = s3_bucket or os.getenv('ZILLOW_S3_BUCKET')
         self.s3_prefix = s3_prefix or os.getenv('ZILLOW_S3_PREFIX', '../../crawler/session_data')
         self._s3_client = None
 
-    def fetch_recently_sold(self, data: Dict):
+    def fetch_search_page(self, data: Dict) -> SearchResponse:
+        """Fetch a single page of search results, decoded straight into records"""
         url = "https://www.zillow.com/async-create-search-page-state"
-        time.sleep(1)
         response = self.put(url, json=data)
         if response.status_code != 200:
             raise Exception(f"Request to {url} failed with status code {response.status_code}")
-        results = response.json()
-        if results.get("cat1").get("searchList").get("totalPages") > 1:
-            raise Exception(f"Too many results for {self.city}")
-        return response.json()
-
-    def parse_recently_sold(self, data: Dict):
-        search_result = data.get("cat1")
-        results = search_result.get("searchResults")
-        list_results = results.get("listResults")
-        homes = []
-        for result in list_results:
-            home_info = result.get("hdpData").get("homeInfo")
-            homes.append({
-                "url": result.get("detailUrl"),
-                "sold_price": result.get("soldPrice"),
-                "raw_sold_price": result.get("price") or result.get("unformattedPrice"),
-                "address": {
-                    "city": result.get("addressCity"),
-                    "street": result.get("addressStreet"),
-                    "state": result.get("addressState"),
-                    "zipcode": result.get("addressZipcode"),
-                },
-                "date_sold": home_info.get("dateSold"),
-                "bathrooms": result.get("bathrooms"),
-                "bedrooms": result.get("bedrooms"),
-                "sqft": result.get("livingArea"),
-                "days_on_market": home_info.get("daysOnZillow"),
-                "type": home_info.get("homeType"),
-                "zestimate": home_info.get("zestimate"),
-                "lot_size": home_info.get("lotAreaValue"),
-                "lot_size_unit": home_info.get("lotAreaUnit"),
-                "tax_assessment": home_info.get("taxAssessedValue"),
-                "zpid": home_info.get("zpid"),
-            })
+        return decode_search_response(response.content)
+
+    def fetch_recently_sold(self, data: Dict) -> List[SoldHome]:
+        """
+        Fetch every recently sold home for the search payload.
 
+        Searches spanning several pages are covered by splitting the map into
+        tiles that each fit on one page; see ZillowSearchPlanner.
+        """
+        planner = ZillowSearchPlanner(
+            self.fetch_search_page,
+            max_depth=ZILLOW_MAX_TILE_DEPTH,
+            max_workers=ZILLOW_MAX_CONCURRENCY,
+        )
+        homes = planner.fetch(data)
+        print(f"Fetched {len(homes)} homes for {self.city} with {planner.tiles_fetched} request(s)")
         return homes
 
-    def sync_sold(self, data: Dict):
-        results = self.fetch_recently_sold(data)
-        parsed_results = self.parse_recently_sold(results)
-        new_zpids = self._save_to_database(parsed_results)
+    def sync_sold(self, data: Dict, incremental: bool = ZILLOW_INCREMENTAL_SYNC) -> List[int]:
+        """
+        Fetch the city's recently sold homes and store the new ones.
+
+        In incremental mode, homes already stored by an earlier sync (per the
+        city's SYNC_STATE) are dropped in memory, and the database isn't
+        touched at all when the result set is unchanged since the last run.
+        """
+        homes = self.fetch_recently_sold(data)
+        if incremental:
+            new_zpids = self._sync_incremental(homes)
+        else:
+            new_zpids = self._save_to_database(homes)
 
         # Send new zpids to SQS for price history fetching
         if new_zpids:
             self._send_to_sqs(new_zpids)
 
-    def _get_db_connection(self):
-        """Create database connection from environment variables"""
-        return psycopg2.connect(
-            dbname=os.environ.get("DB_NAME", "groceries"),
-            user=os.environ["DB_USER"],
-            password=os.environ["DB_PASSWORD"],
-            host=os.environ["DB_HOST"],
-            port=os.environ.get("DB_PORT", "5432")
+        print(f"Zillow request metrics for {self.city}: {self.concurrency_controller.metrics()}")
+        return new_zpids
+
+    def _sync_incremental(self, homes: List[SoldHome]) -> List[int]:
+        """Save only homes the city's sync state hasn't seen, then record them"""
+        state = SYNC_STATE.load(self.city)
+        digest = CitySyncState.digest(homes)
+        if digest == state.result_digest:
+            print(f"Results unchanged for {self.city} since last sync, skipping database")
+            return []
+
+        unseen = state.filter_new(homes)
+        print(f"{len(unseen)} of {len(homes)} homes for {self.city} not seen by earlier syncs")
+        new_zpids, failed_homes = self._insert_homes(unseen) if unseen else ([], [])
+        # Rejected rows aren't stored: leave them unseen, and keep the digest
+        # from short-circuiting the next sync, so they are retried
+        failed = {id(home) for home in failed_homes}
+        state.record(
+            [home for home in unseen if id(home) not in failed],
+            None if failed_homes else digest,
         )
+        SYNC_STATE.save(self.city, state)
+        return new_zpids
+
+    def _get_db_connection(self):
+        """Get the warm database connection configured from environment variables"""
+        return aws_clients.db_connection()
 
     def _send_to_sqs(self, zpids: List[int]):
         """Send zpids to SQS queue for price history fetching"""
@@ -97,105 +145,100 @@ class Zillow(SimpleCrawler):
             return
 
         try:
-            sqs = boto3.client('sqs')
-
-            for zpid in zpids:
-                message_body = json.dumps({'zpid': zpid})
-                sqs.send_message(
-                    QueueUrl=queue_url,
-                    MessageBody=message_body
-                )
-                print(f"Sent zpid {zpid} to SQS queue")
-
-            print(f"Successfully sent {len(zpids)} messages to SQS")
+            result = SqsBatchPublisher(queue_url).publish({'zpid': zpid} for zpid in zpids)
+            print(f"Sent {result['sent']} of {len(zpids)} messages to SQS")
+            if result['failed']:
+                failed_zpids = [message['zpid'] for message in result['failed']]
+                print(f"Failed to send zpids to SQS: {failed_zpids}")
 
         except Exception as e:
             print(f"Error sending messages to SQS: {e}")
             # Don't raise - SQS failure shouldn't break the scraper
 
-    def _save_to_database(self, homes: List[Dict]) -> List[int]:
+    def _save_to_database(self, homes: List[SoldHome]) -> List[int]:
         """
         Insert homes into database, skip duplicates.
         Returns list of zpids for newly inserted homes.
         """
+        return self._insert_homes(homes)[0]
+
+    def _insert_homes(self, homes: List[SoldHome]) -> Tuple[List[int], List[SoldHome]]:
+        """
+        Insert homes into database, skip duplicates.
+
+        Returns:
+            (zpids of newly inserted homes, homes whose row was rejected by the
+            row-by-row fallback and is therefore not stored)
+        """
         if not homes:
             print(f"No homes to save for {self.city}")
-            return []
+            return [], []
+
+        import psycopg2
+        from psycopg2.extras import execute_values
 
         conn = None
         new_zpids = []
+        failed_homes = []
 
         try:
             conn = self._get_db_connection()
-            cur = conn.cursor()
-
-            # Insert query with RETURNING to get zpids of new records
-            insert_query = """
-                INSERT INTO homes (
-                    url, sold_price, raw_sold_price,
-                    address_city, address_street, address_state, address_zipcode,
-                    date_sold, bedrooms, bathrooms, sqft,
-                    days_on_market, type, zestimate,
-                    lot_size, lot_size_unit, tax_assessment, zpid
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-                ON CONFLICT (address_city, address_street, address_state, date_sold) DO NOTHING
-                RETURNING zpid
-            """
-
-            # Insert one by one to get zpids of new records
-            for home in homes:
+            with conn.cursor() as cur:
+                # Multi-row insert with RETURNING to get zpids of new records
+                insert_query = """
+                    INSERT INTO homes (
+                        url, sold_price, raw_sold_price,
+                        address_city, address_street, address_state, address_zipcode,
+                        date_sold, bedrooms, bathrooms, sqft,
+                        days_on_market, type, zestimate,
+                        lot_size, lot_size_unit, tax_assessment, zpid
+                    ) VALUES %s
+                    ON CONFLICT (address_city, address_street, address_state, date_sold) DO NOTHING
+                    RETURNING zpid
+                """
+
+                values = [home.to_row() for home in homes]
+
+                # Insert the whole page in one round trip
+                cur.execute("SAVEPOINT save_homes")
                 try:
-                    cur.execute(insert_query, (
-                        home.get('url'),
-                        home.get('sold_price'),
-                        home.get('raw_sold_price'),
-                        home.get('address', {}).get('city'),
-                        home.get('address', {}).get('street'),
-                        home.get('address', {}).get('state'),
-                        home.get('address', {}).get('zipcode'),
-                        home.get('date_sold'),
-                        home.get('bedrooms'),
-                        home.get('bathrooms'),
-                        home.get('sqft'),
-                        home.get('days_on_market'),
-                        home.get('type'),
-                        home.get('zestimate'),
-                        home.get('lot_size'),
-                        home.get('lot_size_unit'),
-                        home.get('tax_assessment'),
-                        home.get('zpid')
-                    ))
-
-                    # If insert succeeded (not a duplicate), get the zpid
-                    result = cur.fetchone()
-                    if result:
-                        new_zpids.append(result[0])
-
-                except Exception as e:
-                    print(f"Error inserting home: {e}")
-                    # Continue with other homes
+                    new_zpids = [row[0] for row in execute_values(cur, insert_query, values, fetch=True)]
+                    cur.execute("RELEASE SAVEPOINT save_homes")
+                except psycopg2.Error as e:
+                    # Fall back to one row at a time so a bad row only loses itself
+                    cur.execute("ROLLBACK TO SAVEPOINT save_homes")
+                    cur.execute("RELEASE SAVEPOINT save_homes")
+                    print(f"Batch insert failed for {self.city}, retrying row by row: {e}")
+                    for home, value_tuple in zip(homes, values):
+                        cur.execute("SAVEPOINT save_home")
+                        try:
+                            result = execute_values(cur, insert_query, [value_tuple], fetch=True)
+                            cur.execute("RELEASE SAVEPOINT save_home")
+                            new_zpids.extend(row[0] for row in result)
+                        except psycopg2.Error as e:
+                            cur.execute("ROLLBACK TO SAVEPOINT save_home")
+                            cur.execute("RELEASE SAVEPOINT save_home")
+                            print(f"Error inserting home: {e}")
+                            failed_homes.append(home)
 
             conn.commit()
             print(f"Processed {len(homes)} homes for {self.city}, inserted {len(new_zpids)} new records")
-            return new_zpids
+            return new_zpids, failed_homes
 
         except Exception as e:
             if conn:
-                conn.rollback()
+                if isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+                    aws_clients.discard_db_connection(conn)
+                else:
+                    conn.rollback()
             print(f"Error saving to database for {self.city}: {e}")
             raise
-        finally:
-            if conn:
-                cur.close()
-                conn.close()
 
     @property
     def s3_client(self):
-        """Lazy load S3 client"""
+        """Shared S3 client, reused across warm invocations"""
         if self._s3_client is None and self.s3_bucket:
-            self._s3_client = boto3.client('s3')
+            self._s3_client = aws_clients.s3_client()
         return self._s3_client
 
     def _load_session_data(self, city: str) -> dict:
@@ -203,34 +246,85 @@ class Zillow(SimpleCrawler):
         filename = f"{city.lower()}.json"
 
         if self.s3_bucket:
-            # Load from S3
+            # Load from S3, revalidating a locally cached copy by ETag
             s3_key = f"{self.s3_prefix}/{filename}"
-            response = self.s3_client.get_object(Bucket=self.s3_bucket, Key=s3_key)
-            return json.loads(response['Body'].read().decode('utf-8'))
+            return SESSION_DATA_CACHE.get_json(self.s3_client, self.s3_bucket, s3_key)
         else:
             # Load from local file system
             with open(f"session_data/{filename}") as f:
                 return json.load(f)
 
     @classmethod
-    def for_city(cls, city: str, s3_bucket: Optional[str] = None, s3_prefix: Optional[str] = None):
-        """Factory method to create a crawler for a specific city"""
-        instance = cls(s3_bucket=s3_bucket, s3_prefix=s3_prefix)
-        instance.city = city
-        session_data = instance._load_session_data(city)
-        instance.load_cookies(session_data.get("cookies"))
-        request_data = session_data.get("data")
-        return instance, request_data
+    def for_city(
+        cls,
+        city: str,
+        s3_bucket: Optional[str] = None,
+        s3_prefix: Optional[str] = None,
+        impersonate: str = "chrome",
+    ):
+        """
+        Get a crawler for a specific city.
+
+        Crawlers come from the module-level SESSION_POOL, so warm Lambda
+        invocations reuse the city's session (TLS connections and cookies)
+        and only load its session data again once the pooled one is evicted.
+        """
+
+        def build():
+            instance = cls(s3_bucket=s3_bucket, s3_prefix=s3_prefix, impersonate=impersonate)
+            instance.city = city
+            session_data = instance._load_session_data(city)
+            instance.load_cookies(session_data.get("cookies"))
+            instance.search_data = session_data.get("data")
+            return instance
+
+        key = (cls.__name__, impersonate, city, s3_bucket, s3_prefix)
+        instance = SESSION_POOL.get(key, build)
+        return instance, instance.search_data
 
     def run(self, search_data: Dict):
         self.sync_sold(search_data)
 
     @classmethod
-    def run_all(cls, s3_bucket: Optional[str] = None, s3_prefix: Optional[str] = None):
-        """Run scraper for all cities"""
-        for city in cls.CITIES:
-            crawler, search_data = cls.for_city(city, s3_bucket=s3_bucket, s3_prefix=s3_prefix)
-            crawler.run(search_data)
+    def registry(cls) -> CityRegistry:
+        """City registry (DB or config file) with per-city crawl schedules"""
+        if cls._registry is None:
+            cls._registry = CityRegistry.from_env(ZILLOW_CITIES_CONFIG)
+        return cls._registry
+
+    @classmethod
+    def run_city(cls, city: str, s3_bucket: Optional[str] = None, s3_prefix: Optional[str] = None) -> Dict:
+        """Scrape one city with its own session, record the outcome and reschedule it"""
+        crawler, search_data = cls.for_city(city, s3_bucket=s3_bucket, s3_prefix=s3_prefix)
+        new_zpids = crawler.sync_sold(search_data)
+        stats = cls.registry().record_run(city, len(new_zpids))
+        return {"new_homes": len(new_zpids), "next_run_in_hours": round(stats.interval_hours, 1)}
+
+    @classmethod
+    def run_all(
+        cls,
+        s3_bucket: Optional[str] = None,
+        s3_prefix: Optional[str] = None,
+        max_workers: int = ZILLOW_RUN_WORKERS,
+        executor: str = ZILLOW_RUN_EXECUTOR,
+        due_only: bool = False,
+    ) -> Dict:
+        """
+        Run scraper for the registry's cities in parallel and print a summary.
+
+        With due_only, only cities whose scheduled next run has passed are
+        scraped, so a frequent trigger polls quiet towns rarely.
+        """
+        registry = cls.registry()
+        cities = registry.due() if due_only else registry.cities()
+        summary = run_cities(
+            cities,
+            partial(cls.run_city, s3_bucket=s3_bucket, s3_prefix=s3_prefix),
+            max_workers=max_workers,
+            executor=executor,
+        )
+        print(f"Zillow run summary: {json.dumps(summary)}")
+        return summary
 
 
 if __name__ == '__main__':
@@ -1,4 +1,24 @@
-from crawler.crawler import Crawler
-from aws.zillow.zillow import Zillow
+import importlib
 
-__all__ = ['Crawler', 'Zillow']
+# Exports are imported on first access, so importing a crawler submodule (as
+# the Lambdas do) doesn't pull in requests, httpx or the AWS stack.
+_EXPORTS = {
+    'Crawler': 'crawler.crawler',
+    'AsyncCrawler': 'crawler.async_crawler',
+    'Zillow': 'aws.zillow.zillow',
+}
+
+__all__ = ['Crawler', 'AsyncCrawler', 'Zillow']
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,177 @@
+import asyncio
+import httpx
+import logging
+import sys
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+from crawler.rate_limiter import RateLimiter
+from crawler.retry import RetryPolicy
+from crawler.utils.xpath_utils import bind_custom_html_element
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+handler = logging.StreamHandler(sys.stdout)
+handler.setLevel(logging.DEBUG)
+formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+
+class AsyncCrawler(httpx.AsyncClient):
+    """
+    Async sibling of Crawler backed by httpx.AsyncClient.
+
+    Requests are bounded by a global concurrency cap and a per-host cap so a
+    crawl can fan out over many hosts without hammering any single one.
+
+    Example:
+        async with AsyncCrawler(max_concurrency=50, max_per_host=4) as crawler:
+            pages = await crawler.get_all(urls)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 20,
+        max_per_host: int = 4,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        **kwargs,
+    ):
+        kwargs.setdefault("follow_redirects", True)
+        super().__init__(**kwargs)
+        self.retry_policy = retry_policy or RetryPolicy(
+            retry_exceptions=(httpx.TransportError,)
+        )
+        self.headers.update(
+            {
+                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36"
+            }
+        )
+        self.rate_limiter = rate_limiter
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self._global_semaphore = asyncio.Semaphore(max_concurrency)
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def load_cookies(self, cookies: Dict):
+        for cookie_name, cookie_value in cookies.items():
+            self.cookies.set(cookie_name, cookie_value)
+
+    def save_cookies(self, filepath: str):
+        pass
+
+    def _host_semaphore(self, url) -> asyncio.Semaphore:
+        """Get (or create) the semaphore limiting requests to the url's host."""
+        host = urlsplit(str(url)).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def _request_with_retries(self, method: str, url, max_retries=None, **kwargs):
+        """Send a request, retrying transient failures according to retry_policy."""
+        policy = self.retry_policy
+        max_retries = policy.max_retries if max_retries is None else max_retries
+        if max_retries < 1:
+            # Counts attempts including the first; zero would return None without sending anything
+            raise ValueError(f"max_retries must be at least 1, got {max_retries}")
+        label = "" if method == "GET" else f"{method} "
+        host = urlsplit(str(url)).netloc
+
+        for attempt in range(max_retries):
+            policy.record_request(host)
+            raw_response = None
+            if self.rate_limiter is not None:
+                await self.rate_limiter.async_acquire(url)
+            try:
+                async with self._global_semaphore, self._host_semaphore(url):
+                    raw_response = await super().request(method, url, **kwargs)
+            except policy.retry_exceptions as e:
+                error = e
+            else:
+                logger.info(f"{label}Response from {url}: {raw_response.status_code}")
+                if raw_response.status_code < 400:
+                    return bind_custom_html_element(raw_response)
+                error = Exception(f"HTTP {raw_response.status_code} error")
+
+            delay = None
+            if attempt < max_retries - 1:
+                delay = policy.retry_delay(
+                    attempt, host, response=raw_response, exception=error
+                )
+            if delay is None:
+                logger.error(
+                    f"Failed {label}request to {url} after {attempt + 1} attempts: {error}"
+                )
+                raise error
+
+            # Back off outside the semaphores so other requests keep running
+            logger.warning(
+                f"Retry {attempt + 1}/{max_retries} for {label}{url} after {delay:.1f}s: {error}"
+            )
+            await policy.async_wait(delay)
+
+    async def get(self, url, max_retries=None, **kwargs):
+        """GET request with retry logic, bounded by the global and per-host caps."""
+        return await self._request_with_retries("GET", url, max_retries, **kwargs)
+
+    async def post(self, url, max_retries=None, **kwargs):
+        """POST request with retry logic, bounded by the global and per-host caps."""
+        return await self._request_with_retries("POST", url, max_retries, **kwargs)
+
+    async def get_all(
+        self, urls: Iterable[str], return_exceptions: bool = False, **kwargs
+    ) -> List:
+        """
+        Fetch many urls concurrently.
+
+        Args:
+            urls: Urls to fetch
+            return_exceptions: Return failures in place instead of raising the first
+            **kwargs: Additional arguments to pass to each GET request
+
+        Returns:
+            List of responses in the same order as urls
+        """
+        return await asyncio.gather(
+            *(self.get(url, **kwargs) for url in urls),
+            return_exceptions=return_exceptions,
+        )
+
+    async def submit(
+        self, page, form_selector=".//form", additional_data=None, **kwargs
+    ):
+        """
+        Submit a form from a page.
+
+        Args:
+            page: The page element containing the form
+            form_selector: XPath selector for the form (default: ".//form" for first form)
+            additional_data: Dictionary of additional form data to include/override
+            **kwargs: Additional arguments to pass to the POST/GET request
+
+        Returns:
+            Response from form submission
+
+        Example:
+            response = await crawler.submit(page)
+            response = await crawler.submit(page, ".//form[@name='login']", {"username": "user"})
+        """
+        form = page.first(form_selector)
+
+        form_action = form.get("action") or ""
+        form_method = (form.get("method") or "get").lower()
+
+        submit_url = urljoin(str(page.url), form_action)
+
+        form_data = form.data()
+        if additional_data:
+            form_data.update(additional_data)
+
+        if form_method == "post":
+            return await self.post(submit_url, data=form_data, **kwargs)
+        else:
+            return await self.get(submit_url, params=form_data, **kwargs)
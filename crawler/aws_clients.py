@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+from typing import Dict
+
+# Module-scope clients survive between warm Lambda invocations. boto3 and
+# psycopg2 are imported on first use so cold starts that never touch them
+# (e.g. a run that only hits the HTTP cache) don't pay for the import.
+_CLIENTS: Dict[str, object] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+_DB_CONNECTIONS: Dict[tuple, Dict] = {}
+_DB_LOCK = threading.Lock()
+
+# Connections idle for longer than this are pinged before being reused
+DB_PING_AFTER = float(os.getenv("DB_PING_AFTER", "30"))
+
+
+def boto3_client(service: str, endpoint_url: str = None):
+    """Get the process-wide boto3 client for service, creating it on first use."""
+    key = f"{service}:{endpoint_url or ''}"
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            import boto3
+
+            client = boto3.client(service, endpoint_url=endpoint_url)
+            _CLIENTS[key] = client
+        return client
+
+
+def s3_client():
+    """Shared S3 client; S3_ENDPOINT_URL points it at a local stand-in."""
+    return boto3_client("s3", os.getenv("S3_ENDPOINT_URL"))
+
+
+def sqs_client():
+    """Shared SQS client; SQS_ENDPOINT_URL points it at a local stand-in (e.g. ElasticMQ)."""
+    return boto3_client("sqs", os.getenv("SQS_ENDPOINT_URL"))
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _prune_dead_threads():
+    """Close connections whose thread has exited (caller holds _DB_LOCK)."""
+    for params, entry in list(_DB_CONNECTIONS.items()):
+        if not entry["thread"].is_alive():
+            del _DB_CONNECTIONS[params]
+            _close_quietly(entry["conn"])
+
+
+def _is_alive(conn) -> bool:
+    if conn.closed:
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except Exception:
+        return False
+
+
+def db_connection(dbname: str = None):
+    """
+    Get a warm database connection built from the DB_* environment variables.
+
+    The connection is kept at module scope and reused by later calls (and
+    warm invocations) on the same thread. Threads never share one, since a
+    psycopg2 connection has a single transaction. A connection idle for more
+    than DB_PING_AFTER seconds is checked with SELECT 1 first and replaced if
+    the server dropped it. Callers commit or roll back but must not close it.
+
+    Worker threads come and go (run_cities builds a new pool per run), so
+    the connections of threads that have exited are closed on each call
+    instead of staying open until the process dies.
+    """
+    import psycopg2
+
+    params = (
+        dbname or os.environ.get("DB_NAME", "groceries"),
+        os.environ["DB_USER"],
+        os.environ["DB_HOST"],
+        os.environ.get("DB_PORT", "5432"),
+        threading.get_ident(),
+    )
+    thread = threading.current_thread()
+    with _DB_LOCK:
+        # A reused thread id finds its dead predecessor's entry closed here
+        _prune_dead_threads()
+        entry = _DB_CONNECTIONS.get(params)
+        now = time.monotonic()
+        if entry is not None:
+            conn = entry["conn"]
+            idle = now - entry["last_used"]
+            if conn.closed or (idle > DB_PING_AFTER and not _is_alive(conn)):
+                _close_quietly(conn)
+                entry = None
+
+        if entry is None:
+            conn = psycopg2.connect(
+                dbname=params[0],
+                user=params[1],
+                password=os.environ["DB_PASSWORD"],
+                host=params[2],
+                port=params[3],
+            )
+            entry = {"conn": conn, "thread": thread}
+            _DB_CONNECTIONS[params] = entry
+        entry["last_used"] = now
+        return entry["conn"]
+
+
+def discard_db_connection(conn):
+    """Close a warm connection and forget it, e.g. after a connection error."""
+    with _DB_LOCK:
+        for params, entry in list(_DB_CONNECTIONS.items()):
+            if entry["conn"] is conn:
+                del _DB_CONNECTIONS[params]
+    _close_quietly(conn)
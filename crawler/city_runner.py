@@ -0,0 +1,80 @@
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+def _run_one(run: Callable[[str], Any], city: str) -> Dict:
+    """Run one city, capturing its result or error and how long it took."""
+    started = time.monotonic()
+    try:
+        result = run(city)
+        return {"city": city, "ok": True, "result": result, "seconds": time.monotonic() - started}
+    except Exception as e:
+        traceback.print_exc()
+        return {
+            "city": city,
+            "ok": False,
+            "error": f"{type(e).__name__}: {e}",
+            "seconds": time.monotonic() - started,
+        }
+
+
+def run_cities(
+    cities: Iterable[str],
+    run: Callable[[str], Any],
+    max_workers: int = 4,
+    executor: str = "thread",
+    initializer: Optional[Callable] = None,
+) -> Dict:
+    """
+    Run run(city) for every city in parallel and summarize the outcome.
+
+    Each call should build its own session for the city, so cities never
+    share cookie jars. One failing city doesn't stop the others; its error is
+    reported in the summary instead. An interrupt (KeyboardInterrupt,
+    SystemExit) cancels the cities not started yet and is re-raised at once;
+    cities already running on threads can't be stopped and finish on their
+    own, so a caller that must exit immediately has to os._exit.
+
+    Args:
+        cities: City names to run
+        run: Callable taking a city name; must be picklable with executor="process"
+        max_workers: Cities run at the same time
+        executor: "thread" (default) or "process"
+        initializer: Called once in every worker process (process executor only)
+
+    Returns:
+        {"succeeded": {city: result}, "failed": {city: error}, "seconds": {city: seconds},
+         "total_seconds": wall time}
+
+    Example:
+        summary = run_cities(Zillow.registry().cities(), Zillow.run_city, max_workers=4)
+    """
+    started = time.monotonic()
+    if executor == "process":
+        pool = ProcessPoolExecutor(max_workers=max_workers, initializer=initializer)
+    elif executor == "thread":
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+    else:
+        raise ValueError(f"Unknown executor: {executor}")
+
+    summary = {"succeeded": {}, "failed": {}, "seconds": {}}
+    try:
+        futures = [pool.submit(partial(_run_one, run, city)) for city in cities]
+        for future in as_completed(futures):
+            outcome = future.result()
+            city = outcome["city"]
+            summary["seconds"][city] = round(outcome["seconds"], 1)
+            if outcome["ok"]:
+                summary["succeeded"][city] = outcome["result"]
+            else:
+                summary["failed"][city] = outcome["error"]
+    except BaseException:
+        # Interrupted: drop cities that haven't begun and don't wait for running ones
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown(wait=True)
+    summary["total_seconds"] = round(time.monotonic() - started, 1)
+    return summary
@@ -0,0 +1,268 @@
+import fcntl
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+HOUR = 3600
+
+
+class CityStats:
+    """Registry entry for one city: its schedule and what past syncs found."""
+
+    __slots__ = (
+        "city", "enabled", "runs", "new_rows_per_hour", "interval_hours",
+        "last_run_at", "last_change_at", "next_run_at",
+    )
+
+    def __init__(
+        self,
+        city: str,
+        enabled: bool = True,
+        runs: int = 0,
+        new_rows_per_hour: Optional[float] = None,
+        interval_hours: Optional[float] = None,
+        last_run_at: Optional[float] = None,
+        last_change_at: Optional[float] = None,
+        next_run_at: Optional[float] = None,
+    ):
+        self.city = city
+        self.enabled = enabled
+        self.runs = runs
+        self.new_rows_per_hour = new_rows_per_hour
+        self.interval_hours = interval_hours
+        self.last_run_at = last_run_at
+        self.last_change_at = last_change_at
+        self.next_run_at = next_run_at
+
+    def is_due(self, now: float) -> bool:
+        return self.enabled and (self.next_run_at is None or self.next_run_at <= now)
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class CityScheduler:
+    """
+    Picks each city's next run time from how fast new sales appear there.
+
+    Every run updates an exponentially weighted average of new rows per
+    hour. The next interval is the time expected to accumulate
+    `target_new_rows` new sales, clamped to [min_hours, max_hours]. Without a
+    rate yet, a run that found sales schedules the next one at min_hours and
+    an empty one backs off by `backoff`. Busy towns are polled often and
+    quiet ones rarely, so adding towns doesn't multiply request volume.
+
+    Example:
+        scheduler = CityScheduler(min_hours=6, max_hours=168)
+        scheduler.record_run(stats, new_rows=3)
+        stats.next_run_at  # epoch seconds
+    """
+
+    def __init__(
+        self,
+        min_hours: float = 6,
+        max_hours: float = 168,
+        target_new_rows: float = 1.0,
+        alpha: float = 0.3,
+        backoff: float = 2.0,
+    ):
+        self.min_hours = min_hours
+        self.max_hours = max_hours
+        self.target_new_rows = target_new_rows
+        self.alpha = alpha
+        self.backoff = backoff
+
+    def next_interval(self, stats: CityStats, new_rows: int = 0) -> float:
+        """Hours until the city's next run."""
+        rate = stats.new_rows_per_hour
+        if rate:
+            hours = self.target_new_rows / rate
+        elif new_rows:
+            hours = self.min_hours
+        else:
+            hours = (stats.interval_hours or self.min_hours) * self.backoff
+        return min(self.max_hours, max(self.min_hours, hours))
+
+    def record_run(self, stats: CityStats, new_rows: int, now: Optional[float] = None) -> CityStats:
+        """Fold one sync's outcome into the city's stats and reschedule it."""
+        now = time.time() if now is None else now
+        if stats.last_run_at is not None:
+            elapsed_hours = max((now - stats.last_run_at) / HOUR, 1 / 60)
+            observed = new_rows / elapsed_hours
+            if stats.new_rows_per_hour is None:
+                stats.new_rows_per_hour = observed
+            else:
+                stats.new_rows_per_hour = (
+                    self.alpha * observed + (1 - self.alpha) * stats.new_rows_per_hour
+                )
+        stats.runs += 1
+        stats.last_run_at = now
+        if new_rows:
+            stats.last_change_at = now
+        stats.interval_hours = self.next_interval(stats, new_rows)
+        stats.next_run_at = now + stats.interval_hours * HOUR
+        return stats
+
+
+class FileCityRegistry:
+    """
+    City registry read from a JSON config file, with stats in a state file.
+
+    The config file lists the cities ({"cities": ["Collingswood", ...]}); the
+    state file holds their CityStats and must be writable. Saves hold an
+    flock on a lock file next to it, so cities finishing at once in
+    separate processes (ZILLOW_RUN_EXECUTOR=process) don't overwrite each
+    other's stats. For local runs only: on Lambda the state would live in
+    /tmp and be lost on every cold start (see CityRegistry.from_env).
+    """
+
+    def __init__(self, config_path: str, state_path: str):
+        self.config_path = config_path
+        self.state_path = state_path
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, CityStats]:
+        with open(self.config_path) as f:
+            cities = json.load(f)["cities"]
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        return {city: CityStats(**state.get(city, {"city": city})) for city in cities}
+
+    def all(self) -> List[CityStats]:
+        with self._lock:
+            return list(self._load().values())
+
+    def save(self, stats: CityStats):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        with self._lock, open(f"{self.state_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._merge(stats)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _merge(self, stats: CityStats):
+        """Rewrite the state file with stats replacing the city's entry (caller holds the flock)."""
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        state[stats.city] = stats.to_dict()
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+
+class PostgresCityRegistry:
+    """City registry and stats stored in the crawl_cities table."""
+
+    COLUMNS = CityStats.__slots__
+
+    def __init__(self, connect: Callable):
+        self._connect = connect
+
+    def all(self) -> List[CityStats]:
+        conn = self._connect()
+        with conn.cursor() as cur:
+            cur.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM crawl_cities ORDER BY city"
+            )
+            rows = cur.fetchall()
+        conn.rollback()
+        return [CityStats(*row) for row in rows]
+
+    def save(self, stats: CityStats):
+        conn = self._connect()
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in self.COLUMNS[1:])
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    INSERT INTO crawl_cities ({', '.join(self.COLUMNS)})
+                    VALUES ({', '.join(['%s'] * len(self.COLUMNS))})
+                    ON CONFLICT (city) DO UPDATE SET {updates}
+                    """,
+                    tuple(getattr(stats, column) for column in self.COLUMNS),
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+class CityRegistry:
+    """
+    Cities to crawl, their stats and the scheduler that times their runs.
+
+    Args:
+        store: FileCityRegistry or PostgresCityRegistry
+        scheduler: Decides each city's next run time
+
+    Example:
+        registry = CityRegistry.from_env("cities.json")
+        for city in registry.due():
+            new_rows = sync(city)
+            registry.record_run(city, new_rows)
+    """
+
+    def __init__(self, store, scheduler: Optional[CityScheduler] = None):
+        self.store = store
+        self.scheduler = scheduler or CityScheduler()
+
+    @classmethod
+    def from_env(cls, config_path: str) -> "CityRegistry":
+        """
+        Build a registry whose backend is chosen by environment variables.
+
+        CITY_REGISTRY_BACKEND selects file, reading config_path and keeping
+        stats in CITY_REGISTRY_STATE_PATH, or postgres, using the crawl_cities
+        table. It defaults to postgres on Lambda and file elsewhere; the file
+        backend is refused on Lambda, where its /tmp state would be lost on
+        every cold start and make every city due. CITY_SCHEDULE_MIN_HOURS and
+        CITY_SCHEDULE_MAX_HOURS bound the interval between runs of a city.
+        """
+        scheduler = CityScheduler(
+            min_hours=float(os.getenv("CITY_SCHEDULE_MIN_HOURS", "6")),
+            max_hours=float(os.getenv("CITY_SCHEDULE_MAX_HOURS", "168")),
+        )
+        on_lambda = "AWS_LAMBDA_FUNCTION_NAME" in os.environ
+        backend = os.getenv("CITY_REGISTRY_BACKEND", "postgres" if on_lambda else "file")
+        if backend == "file":
+            if on_lambda:
+                raise ValueError("The file city registry is for local runs; use CITY_REGISTRY_BACKEND=postgres on Lambda")
+            state_path = os.getenv("CITY_REGISTRY_STATE_PATH", "/tmp/city_stats.json")
+            store = FileCityRegistry(config_path, state_path)
+        elif backend == "postgres":
+            from crawler.aws_clients import db_connection
+
+            store = PostgresCityRegistry(db_connection)
+        else:
+            raise ValueError(f"Unknown city registry backend: {backend}")
+        return cls(store, scheduler)
+
+    def cities(self) -> List[str]:
+        """Names of every enabled city."""
+        return [stats.city for stats in self.store.all() if stats.enabled]
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Enabled cities whose next run time has passed, most overdue first."""
+        now = time.time() if now is None else now
+        due = [stats for stats in self.store.all() if stats.is_due(now)]
+        due.sort(key=lambda stats: stats.next_run_at or 0)
+        return [stats.city for stats in due]
+
+    def record_run(self, city: str, new_rows: int, now: Optional[float] = None) -> CityStats:
+        """Record a finished sync of city and schedule its next run."""
+        stats = next(
+            (stats for stats in self.store.all() if stats.city == city), CityStats(city)
+        )
+        self.scheduler.record_run(stats, new_rows, now)
+        self.store.save(stats)
+        return stats
@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+class BlockDetector:
+    """Decides whether a response means the target is throttling or blocking us."""
+
+    BLOCK_STATUSES = frozenset({403, 429})
+
+    def is_blocked(self, response) -> bool:
+        return response.status_code in self.BLOCK_STATUSES
+
+
+class ZillowBlockDetector(BlockDetector):
+    """
+    Detects Zillow throttling: 403/429s and PerimeterX captcha pages.
+
+    PerimeterX blocks are sometimes served with a 200, either as an HTML
+    "press & hold" captcha page or as a JSON body carrying a blockScript.
+    Only the captcha element and the blockScript key count: normal pages
+    load the PerimeterX sensor too, so its app ID and name are no signal.
+    """
+
+    MARKERS = (
+        b'id="px-captcha"',
+        b'"blockscript"',
+    )
+
+    # Block pages put their markers near the top; avoid scanning large payloads
+    SNIFF_BYTES = 4096
+
+    def is_blocked(self, response) -> bool:
+        if super().is_blocked(response):
+            return True
+        head = (response.content or b"")[: self.SNIFF_BYTES].lower()
+        return any(marker in head for marker in self.MARKERS)
+
+
+class AIMDController:
+    """
+    Adaptive concurrency limit using additive increase / multiplicative decrease.
+
+    Every healthy response grows the limit by roughly `increase` per round of
+    `limit` requests; a block or error signal multiplies it by
+    `decrease_factor`, at most once per `cooldown` seconds so one burst of
+    blocked in-flight requests only counts as a single cut.
+
+    Example:
+        controller = AIMDController(
+            max_concurrency=8, block_detector=ZillowBlockDetector()
+        )
+        crawler = SimpleCrawler(concurrency_controller=controller)
+        controller.metrics()  # {'concurrency': 3, 'block_rate': 0.0, ...}
+    """
+
+    def __init__(
+        self,
+        min_concurrency: int = 1,
+        max_concurrency: int = 16,
+        initial_concurrency: int = 2,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        cooldown: float = 5.0,
+        window: int = 100,
+        block_detector: Optional[BlockDetector] = None,
+    ):
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.block_detector = block_detector or BlockDetector()
+        self._limit = float(initial_concurrency)
+        self._in_flight = 0
+        self._requests = 0
+        self._blocks = 0
+        self._errors = 0
+        self._recent_blocks = deque(maxlen=window)
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+
+    @property
+    def concurrency(self) -> int:
+        """Current number of requests allowed in flight."""
+        return max(self.min_concurrency, int(self._limit))
+
+    def acquire(self):
+        """Block until a request slot is free under the current limit."""
+        with self._condition:
+            while self._in_flight >= self.concurrency:
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, blocked: bool = False, error: bool = False):
+        """Free a request slot and adjust the limit from its outcome."""
+        with self._condition:
+            self._in_flight -= 1
+            self._requests += 1
+            self._blocks += blocked
+            self._errors += error
+            self._recent_blocks.append(blocked)
+
+            if blocked or error:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self._limit = max(
+                        self.min_concurrency, self._limit * self.decrease_factor
+                    )
+                    self._last_decrease = now
+            else:
+                self._limit = min(
+                    self.max_concurrency, self._limit + self.increase / self._limit
+                )
+            self._condition.notify_all()
+
+    def metrics(self) -> Dict[str, float]:
+        """Current concurrency, recent block rate and lifetime counters."""
+        with self._condition:
+            recent = len(self._recent_blocks)
+            return {
+                "concurrency": self.concurrency,
+                "in_flight": self._in_flight,
+                "block_rate": sum(self._recent_blocks) / recent if recent else 0.0,
+                "requests": self._requests,
+                "blocks": self._blocks,
+                "errors": self._errors,
+            }
+
+
+# Controllers shared by every session in the process, keyed by name
+_SHARED_CONTROLLERS: Dict[str, AIMDController] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_concurrency_controller(name: str, **kwargs) -> AIMDController:
+    """Get the process-wide controller called name, creating it on first use."""
+    with _SHARED_LOCK:
+        controller = _SHARED_CONTROLLERS.get(name)
+        if controller is None:
+            controller = AIMDController(**kwargs)
+            _SHARED_CONTROLLERS[name] = controller
+        return controller
+
+
+class AdaptiveConcurrencyMixin:
+    """
+    Session mixin that runs every network request through an AIMDController.
+
+    `blocked` reflects whether the latest response was flagged by the
+    controller's block detector, so pools can retire blocked sessions.
+    """
+
+    concurrency_controller: Optional[AIMDController] = None
+    blocked = False
+
+    def request(self, method, url, *args, **kwargs):
+        controller = self.concurrency_controller
+        if controller is None:
+            return super().request(method, url, *args, **kwargs)
+
+        blocked = error = False
+        controller.acquire()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+            blocked = self.blocked = controller.block_detector.is_blocked(response)
+            error = not blocked and response.status_code >= 500
+            return response
+        except Exception:
+            error = True
+            raise
+        finally:
+            controller.release(blocked=blocked, error=error)
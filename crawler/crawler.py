@@ -1,11 +1,12 @@
 import logging
 import requests
 import sys
-import time
-import traceback
-from typing import Dict
-from urllib.parse import urljoin
+from typing import Dict, Optional
+from urllib.parse import urljoin, urlsplit
 
+from crawler.http_cache import HttpCache, HttpCacheMixin
+from crawler.rate_limiter import RateLimiter, RateLimitMixin
+from crawler.retry import RetryPolicy
 from crawler.utils.xpath_utils import bind_custom_html_element
 
 
@@ -18,10 +19,26 @@ handler.setFormatter(formatter)
 logger.addHandler(handler)
 
 
-class Crawler(requests.Session):
+# Transport errors worth retrying; anything else (bad url, ...) fails immediately
+RETRY_EXCEPTIONS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
 
-    def __init__(self):
+
+class Crawler(HttpCacheMixin, RateLimitMixin, requests.Session):
+
+    def __init__(
+        self,
+        retry_policy: Optional[RetryPolicy] = None,
+        http_cache: Optional[HttpCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
         super().__init__()
+        self.retry_policy = retry_policy or RetryPolicy(retry_exceptions=RETRY_EXCEPTIONS)
+        self.http_cache = http_cache or HttpCache.from_env()
+        self.rate_limiter = rate_limiter
         self.headers.update(
             {
                 "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36"
@@ -35,70 +52,52 @@ class Crawler(requests.Session):
     def save_cookies(self, filepath: str):
         pass
 
-    def get(self, url, max_retries=3, **kwargs):
-        for attempt in range(max_retries):
-            try:
-                # Exponential backoff: wait before retry (skip on first attempt)
-                if attempt > 0:
-                    sleep_time = 2**attempt  # 2, 4, 8 seconds
-                    logger.warning(
-                        f"Retry {attempt}/{max_retries} for {url} after {sleep_time}s"
-                    )
-                    time.sleep(sleep_time)
-
-                raw_response = super().get(url, **kwargs)
-                logger.info(f"Response from {url}: {raw_response.status_code}")
-
-                if raw_response.status_code >= 400:
-                    raise Exception(f"HTTP {raw_response.status_code} error")
-
-                response = bind_custom_html_element(raw_response)
-                return response
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    # Last attempt failed
-                    logger.error(
-                        f"Failed to request {url} after {max_retries} attempts"
-                    )
-                    logger.error(traceback.format_exc())
-                    raise  # Re-raise the exception
-
-                logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}")
-        # Should never reach here, but just in case
-        raise Exception(f"Failed to fetch {url} after {max_retries} retries")
-
-    def post(self, url, max_retries=3, **kwargs):
-        """POST request with retry logic and exponential backoff."""
+    def _request_with_retries(self, method: str, url, max_retries=None, **kwargs):
+        """Send a request, retrying transient failures according to retry_policy."""
+        policy = self.retry_policy
+        max_retries = policy.max_retries if max_retries is None else max_retries
+        if max_retries < 1:
+            # Counts attempts including the first; zero would return None without sending anything
+            raise ValueError(f"max_retries must be at least 1, got {max_retries}")
+        label = "" if method == "GET" else f"{method} "
+        host = urlsplit(url).netloc
+
         for attempt in range(max_retries):
+            policy.record_request(host)
+            raw_response = None
             try:
-                # Exponential backoff: wait before retry (skip on first attempt)
-                if attempt > 0:
-                    sleep_time = 2**attempt  # 2, 4, 8 seconds
-                    logger.warning(
-                        f"Retry {attempt}/{max_retries} for POST {url} after {sleep_time}s"
-                    )
-                    time.sleep(sleep_time)
-
-                raw_response = super().post(url, **kwargs)
-                logger.info(f"POST response from {url}: {raw_response.status_code}")
-
-                if raw_response.status_code >= 400:
-                    raise Exception(f"HTTP {raw_response.status_code} error")
-
-                response = bind_custom_html_element(raw_response)
-                return response
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    # Last attempt failed
-                    logger.error(
-                        f"Failed POST request to {url} after {max_retries} attempts"
-                    )
-                    logger.error(traceback.format_exc())
-                    raise  # Re-raise the exception
-
-                logger.warning(f"POST attempt {attempt + 1} failed for {url}: {e}")
-        # Should never reach here, but just in case
-        raise Exception(f"Failed to POST {url} after {max_retries} retries")
+                raw_response = super().request(method, url, **kwargs)
+            except policy.retry_exceptions as e:
+                error = e
+            else:
+                logger.info(f"{label}Response from {url}: {raw_response.status_code}")
+                if raw_response.status_code < 400:
+                    return bind_custom_html_element(raw_response)
+                error = Exception(f"HTTP {raw_response.status_code} error")
+
+            delay = None
+            if attempt < max_retries - 1:
+                delay = policy.retry_delay(
+                    attempt, host, response=raw_response, exception=error
+                )
+            if delay is None:
+                logger.error(
+                    f"Failed {label}request to {url} after {attempt + 1} attempts: {error}"
+                )
+                raise error
+
+            logger.warning(
+                f"Retry {attempt + 1}/{max_retries} for {label}{url} after {delay:.1f}s: {error}"
+            )
+            policy.wait(delay)
+
+    def get(self, url, max_retries=None, **kwargs):
+        """GET request with retry logic and jittered exponential backoff."""
+        return self._request_with_retries("GET", url, max_retries, **kwargs)
+
+    def post(self, url, max_retries=None, **kwargs):
+        """POST request with retry logic and jittered exponential backoff."""
+        return self._request_with_retries("POST", url, max_retries, **kwargs)
 
     def submit(self, page, form_selector=".//form", additional_data=None, **kwargs):
         """
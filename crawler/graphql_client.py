@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+ZILLOW_GRAPHQL_URL = "https://www.zillow.com/graphql/"
+
+# Directory holding the .graphql documents, one file per operation
+QUERY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "graphql")
+
+
+class PersistedQuery:
+    """
+    A GraphQL operation that can be sent by hash instead of by text.
+
+    Args:
+        name: Operation name
+        document: Query text; defaults to QUERY_DIR/<name>.graphql, read on first use
+        sha256: Hash the server has registered for the operation. Defaults to
+            the hash of the document, as automatic persisted queries expect.
+
+    Example:
+        FULL_RENDER_QUERY.sha256  # what goes in extensions.persistedQuery
+        FULL_RENDER_QUERY.document  # only sent when the server misses the hash
+    """
+
+    def __init__(self, name: str, document: Optional[str] = None, sha256: Optional[str] = None):
+        self.name = name
+        self._document = document
+        self._sha256 = sha256
+
+    @property
+    def document(self) -> str:
+        if self._document is None:
+            with open(os.path.join(QUERY_DIR, f"{self.name}.graphql")) as f:
+                self._document = f.read()
+        return self._document
+
+    @property
+    def document_sha256(self) -> str:
+        return hashlib.sha256(self.document.encode("utf-8")).hexdigest()
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256 or self.document_sha256
+
+
+# Zillow's property page query, registered under the hash the backfills use
+FULL_RENDER_QUERY = PersistedQuery(
+    "NotForSaleShopperPlatformFullRenderQuery",
+    sha256="4dae43213dc50a3fe01c15455df088f46f37ef86aa0af63b24bf0331de593bdc",
+)
+
+
+def full_render_variables(zpid: int) -> Dict:
+    """Variables the property page sends with FULL_RENDER_QUERY."""
+    return {
+        "zpid": zpid,
+        "altId": None,
+        "deviceType": "desktop",
+        "deviceTypeV2": "WEB_DESKTOP",
+        "useOmpV2": True,
+        "includeLastSoldListing": False,
+    }
+
+
+def _zpid_variables(zpid: int) -> Dict:
+    return {"zpid": zpid}
+
+
+class QueryProfile:
+    """
+    A property query and the top-level property fields it selects.
+
+    Args:
+        name: Profile name, e.g. "price_history_only"
+        query: Operation fetching the property
+        fields: Top-level fields of `property` it selects; None means everything
+        variables: Builds the operation's variables from a zpid
+    """
+
+    def __init__(
+        self,
+        name: str,
+        query: PersistedQuery,
+        fields: Optional[Iterable[str]] = None,
+        variables: Callable[[int], Dict] = _zpid_variables,
+    ):
+        self.name = name
+        self.query = query
+        self.fields: Optional[FrozenSet[str]] = None if fields is None else frozenset(fields)
+        self.variables = variables
+
+    def covers(self, fields: Iterable[str]) -> bool:
+        return self.fields is None or self.fields.issuperset(fields)
+
+
+# Smallest first, so the first profile covering a call site's fields is the cheapest
+QUERY_PROFILES = {
+    profile.name: profile
+    for profile in (
+        QueryProfile(
+            "price_history_only",
+            PersistedQuery("PriceHistoryQuery"),
+            fields=("zpid", "priceHistory"),
+        ),
+        QueryProfile(
+            "facts_only",
+            PersistedQuery("PropertyFactsQuery"),
+            fields=(
+                "zpid", "livingArea", "bedrooms", "bathrooms", "daysOnZillow", "homeType",
+                "zestimate", "lotAreaValue", "lotAreaUnit", "taxHistory", "priceHistory",
+            ),
+        ),
+        QueryProfile("full", FULL_RENDER_QUERY, variables=full_render_variables),
+    )
+}
+
+
+def smallest_profile(fields: Iterable[str]) -> QueryProfile:
+    """The cheapest profile selecting every one of fields."""
+    fields = frozenset(fields)
+    return next(profile for profile in QUERY_PROFILES.values() if profile.covers(fields))
+
+
+class GraphQLError(Exception):
+    """A GraphQL response that doesn't carry the data that was asked for."""
+
+
+def property_payload(response, payload: Optional[Dict]) -> Dict:
+    """
+    The `property` object of a property query's response.
+
+    Raises:
+        GraphQLError: If the status isn't 200, the body isn't JSON, the
+            response has GraphQL errors or it has no property data
+    """
+    if response.status_code != 200:
+        raise GraphQLError(f"GraphQL request failed with status code {response.status_code}")
+    if payload is None:
+        raise GraphQLError("GraphQL response is not JSON")
+    if payload.get("errors"):
+        raise GraphQLError(f"GraphQL errors: {payload['errors']}")
+    property_details = (payload.get("data") or {}).get("property")
+    if not property_details:
+        raise GraphQLError("GraphQL response has no property data")
+    return property_details
+
+
+def _persisted_query_missed(payload: Optional[Dict]) -> bool:
+    """Whether a response says the server doesn't know the query hash."""
+    for error in (payload or {}).get("errors") or []:
+        code = (error.get("extensions") or {}).get("code", "")
+        message = error.get("message", "")
+        if "PERSISTED_QUERY_NOT_FOUND" in code or "PersistedQueryNotFound" in message:
+            return True
+    return False
+
+
+class GraphQLClient:
+    """
+    Sends persisted queries by hash, falling back to the full document.
+
+    By default an operation goes out as a GET carrying only its hash and
+    variables, which is small and cacheable. If the server answers with
+    PersistedQueryNotFound, the same call is retried as a POST with the full
+    document, and that operation keeps using POSTs from then on.
+
+    Args:
+        session: SimpleCrawler/Crawler used for the requests
+        url: GraphQL endpoint
+
+    Example:
+        client = GraphQLClient(crawler)
+        response, payload = client.fetch_property(zpid, ("priceHistory",))
+        property_payload(response, payload)["priceHistory"]
+    """
+
+    def __init__(self, session, url: str = ZILLOW_GRAPHQL_URL):
+        self.session = session
+        self.url = url
+        self._unpersisted = set()
+        self._lock = threading.Lock()
+
+    def execute(self, query: PersistedQuery, variables: Dict, **kwargs) -> Tuple[object, Optional[Dict]]:
+        """
+        Run query with variables.
+
+        Args:
+            query: Operation to run
+            variables: GraphQL variables
+            **kwargs: Additional arguments for the HTTP request (e.g. headers)
+
+        Returns:
+            The HTTP response and its decoded JSON body (None if not a JSON object)
+        """
+        if query.sha256 not in self._unpersisted:
+            params = {
+                "operationName": query.name,
+                "variables": json.dumps(variables, separators=(",", ":")),
+                "extensions": json.dumps(
+                    {"persistedQuery": {"version": 1, "sha256Hash": query.sha256}},
+                    separators=(",", ":"),
+                ),
+            }
+            response = self.session.get(self.url, params=params, **kwargs)
+            payload = self._decode(response)
+            if not _persisted_query_missed(payload):
+                return response, payload
+            print(f"Persisted query {query.name} not found, sending full document")
+            with self._lock:
+                self._unpersisted.add(query.sha256)
+
+        data = {
+            "operationName": query.name,
+            "variables": variables,
+            "query": query.document,
+            "extensions": {
+                "persistedQuery": {"version": 1, "sha256Hash": query.document_sha256}
+            },
+        }
+        response = self.session.post(
+            self.url, params={"operationName": query.name}, json=data, **kwargs
+        )
+        return response, self._decode(response)
+
+    def fetch_property(self, zpid: int, fields: Iterable[str], **kwargs) -> Tuple[object, Optional[Dict]]:
+        """
+        Fetch a property with the smallest query profile selecting fields.
+
+        Args:
+            zpid: Zillow property ID
+            fields: Top-level property fields the caller reads, e.g. ("priceHistory",)
+            **kwargs: Additional arguments for the HTTP request (e.g. headers)
+
+        Returns:
+            The HTTP response and its decoded JSON body (None if not a JSON object)
+        """
+        profile = smallest_profile(fields)
+        return self.execute(profile.query, profile.variables(zpid), **kwargs)
+
+    @staticmethod
+    def _decode(response) -> Optional[Dict]:
+        try:
+            payload = response.json()
+        except ValueError:
+            return None
+        return payload if isinstance(payload, dict) else None
@@ -0,0 +1,288 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, Optional
+
+
+# Headers describing the wire encoding; stored bodies are already decoded
+_SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class CachedHeaders(dict):
+    """Case-insensitive header mapping for cached responses."""
+
+    def __init__(self, headers: Dict[str, str]):
+        super().__init__((key.lower(), value) for key, value in headers.items())
+
+    def __getitem__(self, key: str) -> str:
+        return super().__getitem__(key.lower())
+
+    def __contains__(self, key) -> bool:
+        return super().__contains__(key.lower())
+
+    def get(self, key: str, default=None):
+        return super().get(key.lower(), default)
+
+
+class CachedResponse:
+    """Minimal response object replayed from the HTTP cache."""
+
+    from_cache = True
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CachedHeaders(headers)
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        match = re.search(r"charset=([\w-]+)", self.headers.get("content-type", ""))
+        return self.content.decode(match.group(1) if match else "utf-8", errors="replace")
+
+    def json(self, **kwargs):
+        return json.loads(self.content, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"<CachedResponse [{self.status_code}]>"
+
+
+class HttpCache:
+    """
+    On-disk HTTP response cache with conditional revalidation.
+
+    Bodies are zlib-compressed into a SQLite file and evicted least recently
+    used first once the store grows past max_bytes. Fresh entries are served
+    without touching the network; stale entries carrying an ETag or
+    Last-Modified are revalidated with If-None-Match/If-Modified-Since, and a
+    304 simply extends their lifetime.
+
+    Args:
+        directory: Directory holding the cache database
+        max_bytes: Upper bound on the total compressed body size
+        default_ttl: Seconds a stored response stays fresh
+        ttl_rules: Mapping of url regex to TTL; the first match wins
+        methods: HTTP methods whose responses are cached. Zillow's search
+            (PUT) and GraphQL (POST) calls can be opted in here since the
+            request body is part of the cache key.
+
+    Example:
+        cache = HttpCache(".http_cache", ttl_rules={r"/graphql": 86400})
+        crawler = Crawler(http_cache=cache)
+        crawler.get(url, cache_ttl=60)  # per-request override
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        default_ttl: float = 3600,
+        ttl_rules: Optional[Dict[str, float]] = None,
+        methods: Iterable[str] = ("GET",),
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttl_rules = [
+            (re.compile(pattern), ttl) for pattern, ttl in (ttl_rules or {}).items()
+        ]
+        self.methods = {method.upper() for method in methods}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(directory, "http_cache.sqlite3"), check_same_thread=False
+        )
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses(accessed_at)"
+        )
+        self._db.commit()
+
+    @classmethod
+    def from_env(cls) -> Optional["HttpCache"]:
+        """Build a cache from CRAWLER_HTTP_CACHE_* variables, or None if unset."""
+        directory = os.getenv("CRAWLER_HTTP_CACHE_DIR")
+        if not directory:
+            return None
+        return cls(
+            directory,
+            max_bytes=int(os.getenv("CRAWLER_HTTP_CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+            default_ttl=float(os.getenv("CRAWLER_HTTP_CACHE_TTL", 3600)),
+            methods=os.getenv("CRAWLER_HTTP_CACHE_METHODS", "GET").split(","),
+        )
+
+    @staticmethod
+    def request_key(method: str, url: str, params=None, data=None, json_body=None) -> str:
+        """Stable cache key for a request: method, url, query params and body."""
+        payload = [method.upper(), url, params, data, json_body]
+        serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, url: str) -> float:
+        """TTL for url from the first matching rule, else the default."""
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """Get a stored entry (fresh or stale) and mark it recently used."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, status_code, headers, body, etag, last_modified, expires_at "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._db.commit()
+
+        url, status_code, headers, body, etag, last_modified, expires_at = row
+        return {
+            "response": CachedResponse(
+                url, status_code, json.loads(headers), zlib.decompress(body)
+            ),
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": expires_at > time.time(),
+        }
+
+    def store(self, key: str, response, ttl: float):
+        """Store a response under key, evicting old entries if over max_bytes."""
+        headers = {
+            name.lower(): value
+            for name, value in response.headers.items()
+            if name.lower() not in _SKIPPED_HEADERS
+        }
+        body = zlib.compress(response.content)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, url, status_code, headers, body, size, etag, last_modified, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    str(response.url),
+                    response.status_code,
+                    json.dumps(headers),
+                    body,
+                    len(body),
+                    headers.get("etag"),
+                    headers.get("last-modified"),
+                    now + ttl,
+                    now,
+                ),
+            )
+            self._evict()
+            self._db.commit()
+
+    def refresh(
+        self,
+        key: str,
+        ttl: float,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        """Extend a revalidated (304) entry's lifetime, updating its validators."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) "
+                "WHERE key = ?",
+                (time.time() + ttl, time.time(), etag, last_modified, key),
+            )
+            self._db.commit()
+
+    def _evict(self):
+        """Delete least recently used entries until the store fits max_bytes."""
+        (total,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall():
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        """Remove every stored response."""
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+
+class HttpCacheMixin:
+    """
+    Session mixin that serves requests from an HttpCache when one is attached.
+
+    Works for both requests.Session (Crawler) and curl_cffi's Session
+    (SimpleCrawler), since both route get/post/put through request(). Two
+    extra keyword arguments are accepted per request: cache_key to override
+    the computed key and cache_ttl to override the TTL.
+    """
+
+    http_cache: Optional[HttpCache] = None
+
+    def request(self, method, url, *args, cache_key=None, cache_ttl=None, **kwargs):
+        cache = self.http_cache
+        # Positional request arguments are rare enough to simply bypass the cache
+        if cache is None or method.upper() not in cache.methods or args:
+            return super().request(method, url, *args, **kwargs)
+
+        key = cache_key or cache.request_key(
+            method, url, kwargs.get("params"), kwargs.get("data"), kwargs.get("json")
+        )
+        ttl = cache.ttl_for(url) if cache_ttl is None else cache_ttl
+        entry = cache.lookup(key)
+        if entry is not None and entry["fresh"]:
+            return entry["response"]
+
+        if entry is not None and (entry["etag"] or entry["last_modified"]):
+            headers = dict(kwargs.get("headers") or {})
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+            kwargs["headers"] = headers
+
+        response = super().request(method, url, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            cache.refresh(
+                key,
+                ttl,
+                etag=response.headers.get("etag"),
+                last_modified=response.headers.get("last-modified"),
+            )
+            return entry["response"]
+        if response.status_code == 200:
+            cache.store(key, response, ttl)
+        return response
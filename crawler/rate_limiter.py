@@ -0,0 +1,281 @@
+import asyncio
+import fcntl
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+def _take(tokens: float, elapsed: float, rate: float, capacity: float, amount: float) -> float:
+    """Refill a bucket for the elapsed time, then take amount (may go negative)."""
+    return min(capacity, tokens + elapsed * rate) - amount
+
+
+def _wait_for(tokens: float, rate: float) -> float:
+    """Seconds until a bucket holding `tokens` is back to zero."""
+    return max(0.0, -tokens / rate)
+
+
+class TokenBucket:
+    """
+    In-process token bucket refilled at `rate` tokens per second.
+
+    reserve() always takes the tokens and returns how long the caller must
+    wait for them, so concurrent callers queue up behind each other instead
+    of racing. Up to `capacity` requests can go out back to back when the
+    bucket is full.
+    """
+
+    # Whether reserve() blocks on I/O (a file lock, a database round trip),
+    # in which case async_acquire runs it off the event loop
+    blocking_reserve = False
+
+    def __init__(self, rate: float, capacity: float = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Take tokens and return the seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = _take(
+                self._tokens, now - self._updated_at, self.rate, self.capacity, tokens
+            )
+            self._updated_at = now
+            return _wait_for(self._tokens, self.rate)
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Block until tokens are available, returning the time waited."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def async_acquire(self, tokens: float = 1) -> float:
+        """Wait without blocking the event loop until tokens are available."""
+        if self.blocking_reserve:
+            wait = await asyncio.to_thread(self.reserve, tokens)
+        else:
+            wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket persisted in a file and guarded by flock.
+
+    Every process on the machine that points at the same file shares one
+    budget, e.g. several local backfill workers.
+    """
+
+    blocking_reserve = True
+
+    def __init__(self, path: str, rate: float, capacity: float = 1):
+        super().__init__(rate, capacity)
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def reserve(self, tokens: float = 1) -> float:
+        with self._lock, open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                state = f.read().split()
+                now = time.time()
+                if len(state) == 2:
+                    stored_tokens, updated_at = float(state[0]), float(state[1])
+                else:
+                    stored_tokens, updated_at = float(self.capacity), now
+                remaining = _take(
+                    stored_tokens, now - updated_at, self.rate, self.capacity, tokens
+                )
+                f.seek(0)
+                f.truncate()
+                f.write(f"{remaining} {now}")
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return _wait_for(remaining, self.rate)
+
+
+class PostgresTokenBucket(TokenBucket):
+    """
+    Token bucket stored in the rate_limit_buckets table.
+
+    Workers on different machines (e.g. concurrent Lambdas) share one global
+    budget per key. The refill and take happen in a single UPDATE, so the row
+    lock serializes concurrent reservations.
+    """
+
+    blocking_reserve = True
+
+    RESERVE_QUERY = """
+        INSERT INTO rate_limit_buckets (key, tokens, updated_at)
+        VALUES (%(key)s, %(capacity)s, clock_timestamp())
+        ON CONFLICT (key) DO NOTHING;
+
+        UPDATE rate_limit_buckets
+        SET tokens = LEAST(
+                %(capacity)s,
+                tokens + %(rate)s * EXTRACT(EPOCH FROM clock_timestamp() - updated_at)
+            ) - %(tokens)s,
+            updated_at = clock_timestamp()
+        WHERE key = %(key)s
+        RETURNING tokens
+    """
+
+    def __init__(self, key: str, connect: Callable, rate: float, capacity: float = 1):
+        super().__init__(rate, capacity)
+        self.key = key
+        self._connect = connect
+        self._conn = None
+
+    def reserve(self, tokens: float = 1) -> float:
+        params = {
+            "key": self.key,
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "tokens": tokens,
+        }
+        with self._lock:
+            if self._conn is None or self._conn.closed:
+                self._conn = self._connect()
+            try:
+                with self._conn.cursor() as cur:
+                    cur.execute(self.RESERVE_QUERY, params)
+                    (remaining,) = cur.fetchone()
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return _wait_for(float(remaining), self.rate)
+
+
+class RateLimiter:
+    """
+    Token buckets keyed by host.
+
+    Args:
+        rate: Default requests per second for any host
+        capacity: Default burst size for any host
+        host_limits: Per-host (rate, capacity) overrides
+        bucket_factory: Callable (host, rate, capacity) -> TokenBucket, used to
+            choose the backend; defaults to in-process buckets
+
+    Example:
+        limiter = shared_rate_limiter("zillow", rate=0.5, capacity=2)
+        limiter.acquire("https://www.zillow.com/graphql/")
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1,
+        host_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        bucket_factory: Optional[Callable[[str, float, float], TokenBucket]] = None,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.host_limits = host_limits or {}
+        self.bucket_factory = bucket_factory or (
+            lambda host, rate, capacity: TokenBucket(rate, capacity)
+        )
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(
+        cls, rate: float, capacity: float = 1, name: str = "default"
+    ) -> "RateLimiter":
+        """
+        Build a limiter whose backend is chosen by environment variables.
+
+        CRAWLER_RATE_LIMIT_BACKEND selects memory (default), file or postgres.
+        The file backend keeps one file per host in CRAWLER_RATE_LIMIT_DIR;
+        the postgres backend uses the DB_* connection variables.
+        """
+        backend = os.getenv("CRAWLER_RATE_LIMIT_BACKEND", "memory")
+        if backend == "file":
+            directory = os.getenv("CRAWLER_RATE_LIMIT_DIR", "/tmp/crawler_rate_limits")
+
+            def bucket_factory(host, rate, capacity):
+                filename = re.sub(r"[^\w.-]", "_", f"{name}-{host}")
+                return FileTokenBucket(os.path.join(directory, filename), rate, capacity)
+
+        elif backend == "postgres":
+
+            def connect():
+                import psycopg2
+
+                return psycopg2.connect(
+                    dbname=os.environ.get("DB_NAME", "groceries"),
+                    user=os.environ["DB_USER"],
+                    password=os.environ["DB_PASSWORD"],
+                    host=os.environ["DB_HOST"],
+                    port=os.environ.get("DB_PORT", "5432"),
+                )
+
+            def bucket_factory(host, rate, capacity):
+                return PostgresTokenBucket(f"{name}:{host}", connect, rate, capacity)
+
+        elif backend == "memory":
+            bucket_factory = None
+        else:
+            raise ValueError(f"Unknown rate limit backend: {backend}")
+        return cls(rate, capacity, bucket_factory=bucket_factory)
+
+    def bucket(self, url: str) -> TokenBucket:
+        """Get (or create) the bucket for the url's host."""
+        host = urlsplit(str(url)).netloc or str(url)
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(host)
+                if bucket is None:
+                    rate, capacity = self.host_limits.get(host, (self.rate, self.capacity))
+                    bucket = self.bucket_factory(host, rate, capacity)
+                    self._buckets[host] = bucket
+        return bucket
+
+    def acquire(self, url: str) -> float:
+        """Block until a request to url's host is allowed."""
+        return self.bucket(url).acquire()
+
+    async def async_acquire(self, url: str) -> float:
+        """Wait without blocking the event loop until a request is allowed."""
+        return await self.bucket(url).async_acquire()
+
+
+# Limiters shared by every session in the process, keyed by name
+_SHARED_LIMITERS: Dict[str, RateLimiter] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_rate_limiter(name: str, rate: float, capacity: float = 1) -> RateLimiter:
+    """Get the process-wide limiter called name, creating it from env on first use."""
+    with _SHARED_LOCK:
+        limiter = _SHARED_LIMITERS.get(name)
+        if limiter is None:
+            limiter = RateLimiter.from_env(rate, capacity, name=name)
+            _SHARED_LIMITERS[name] = limiter
+        return limiter
+
+
+class RateLimitMixin:
+    """Session mixin that waits on rate_limiter before every network request."""
+
+    rate_limiter: Optional[RateLimiter] = None
+
+    def request(self, method, url, *args, **kwargs):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(url)
+        return super().request(method, url, *args, **kwargs)
@@ -0,0 +1,164 @@
+import asyncio
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Iterable, Optional, Tuple, Type
+
+
+# Statuses worth retrying: throttling and transient upstream failures.
+# Everything else >= 400 (403, 404, ...) fails immediately.
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class RetryBudget:
+    """
+    Per-host retry budget shared by every crawler in the process.
+
+    Retries to a host are allowed while they stay under `min_retries` plus
+    `ratio` of the requests sent to that host in the last `window` seconds,
+    so a failing host cannot turn every request into a retry storm.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10, window: float = 60.0):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._requests: Dict[str, Deque[float]] = defaultdict(deque)
+        self._retries: Dict[str, Deque[float]] = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def _expire(self, events: Deque[float], now: float):
+        while events and events[0] <= now - self.window:
+            events.popleft()
+
+    def record_request(self, host: str):
+        """Record a request to host, earning it a fraction of a retry."""
+        now = time.monotonic()
+        with self._lock:
+            requests = self._requests[host]
+            requests.append(now)
+            self._expire(requests, now)
+
+    def try_acquire(self, host: str) -> bool:
+        """Spend one retry for host, returning False when the budget is exhausted."""
+        now = time.monotonic()
+        with self._lock:
+            requests = self._requests[host]
+            retries = self._retries[host]
+            self._expire(requests, now)
+            self._expire(retries, now)
+            if len(retries) >= self.min_retries + self.ratio * len(requests):
+                return False
+            retries.append(now)
+            return True
+
+
+DEFAULT_RETRY_BUDGET = RetryBudget()
+
+
+class RetryPolicy:
+    """
+    Decides whether and how long to wait before retrying a request.
+
+    Args:
+        max_retries: Default total attempts per request, including the first
+        base_delay: Backoff scale; attempt n waits up to base_delay * 2**n
+        max_delay: Cap on any single wait. A Retry-After longer than this
+            gives up instead of blocking the caller.
+        retry_statuses: HTTP statuses that are retried
+        retry_exceptions: Exception types treated as transient
+        budget: Per-host RetryBudget (None disables the budget)
+
+    Example:
+        policy = RetryPolicy(max_retries=5, retry_exceptions=(requests.ConnectionError,))
+        crawler = Crawler(retry_policy=policy)
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+        retry_exceptions: Tuple[Type[BaseException], ...] = (ConnectionError, TimeoutError),
+        budget: Optional[RetryBudget] = DEFAULT_RETRY_BUDGET,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_exceptions = retry_exceptions
+        self.budget = budget
+
+    def record_request(self, host: str):
+        """Record an attempt against the host's retry budget."""
+        if self.budget is not None:
+            self.budget.record_request(host)
+
+    def is_retryable(self, response=None, exception: Optional[BaseException] = None) -> bool:
+        """Classify a failed attempt by its response status or exception."""
+        if response is not None:
+            return response.status_code in self.retry_statuses
+        return isinstance(exception, self.retry_exceptions)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given zero-based attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def retry_delay(
+        self, attempt: int, host: str, response=None, exception: Optional[BaseException] = None
+    ) -> Optional[float]:
+        """
+        Get the delay before the next attempt, or None if it should not be retried.
+
+        Args:
+            attempt: Zero-based index of the attempt that just failed
+            host: Host the request was sent to, for the retry budget
+            response: Response of the failed attempt, if one was received
+            exception: Exception raised by the failed attempt, if any
+
+        Returns:
+            Seconds to wait before retrying, or None to give up
+        """
+        if not self.is_retryable(response, exception):
+            return None
+
+        delay = self.backoff(attempt)
+        retry_after = None
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("retry-after"))
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                return None
+            delay = retry_after
+
+        if self.budget is not None and not self.budget.try_acquire(host):
+            return None
+        return delay
+
+    def wait(self, delay: float):
+        """Block the calling thread for delay seconds."""
+        time.sleep(delay)
+
+    async def async_wait(self, delay: float):
+        """Wait delay seconds without blocking the event loop."""
+        await asyncio.sleep(delay)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
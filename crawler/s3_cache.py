@@ -0,0 +1,110 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict
+
+
+class S3JsonCache:
+    """
+    Cache of small JSON objects from S3, such as Zillow session data.
+
+    Objects are kept in memory for `ttl` seconds (which covers warm Lambda
+    invocations) and on disk under `directory` together with their ETag.
+    Once the TTL lapses the object is revalidated with a conditional
+    get_object(IfNoneMatch=etag): an unchanged object costs one round trip
+    with no body, and a changed one replaces the cached copy.
+
+    Args:
+        directory: Directory for cached bodies, e.g. Lambda's /tmp
+        ttl: Seconds a cached object is used without revalidating
+
+    Example:
+        data = SESSION_DATA_CACHE.get_json(s3_client, bucket, "session_data/haddonfield.json")
+    """
+
+    def __init__(self, directory: str, ttl: float = 300):
+        self.directory = directory
+        self.ttl = ttl
+        self.hits = 0
+        self.revalidations = 0
+        self.downloads = 0
+        self._entries: Dict[tuple, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, bucket: str, key: str) -> str:
+        digest = hashlib.sha256(f"{bucket}/{key}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _load_from_disk(self, bucket: str, key: str):
+        try:
+            with open(self._path(bucket, key), "rb") as f:
+                stored = json.load(f)
+            return {"etag": stored["etag"], "data": stored["data"], "checked_at": float("-inf")}
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_to_disk(self, bucket: str, key: str, etag: str, data):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(bucket, key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"etag": etag, "data": data}, f)
+        os.replace(tmp_path, path)
+
+    def get_json(self, client, bucket: str, key: str):
+        """Get the decoded JSON object at bucket/key (a copy, safe to modify)."""
+        cache_key = (bucket, key)
+        with self._lock:
+            entry = self._entries.get(cache_key) or self._load_from_disk(bucket, key)
+            if entry is not None and time.monotonic() - entry["checked_at"] < self.ttl:
+                self.hits += 1
+                return copy.deepcopy(entry["data"])
+
+            request = {"Bucket": bucket, "Key": key}
+            if entry is not None:
+                request["IfNoneMatch"] = entry["etag"]
+            try:
+                response = client.get_object(**request)
+            except Exception as e:
+                if entry is None or not _is_not_modified(e):
+                    raise
+                self.revalidations += 1
+            else:
+                self.downloads += 1
+                data = json.loads(response["Body"].read().decode("utf-8"))
+                entry = {"etag": response.get("ETag"), "data": data}
+                self._save_to_disk(bucket, key, entry["etag"], data)
+
+            entry["checked_at"] = time.monotonic()
+            self._entries[cache_key] = entry
+            return copy.deepcopy(entry["data"])
+
+    def invalidate(self, bucket: str, key: str):
+        """Forget bucket/key, e.g. after uploading a new version of it."""
+        with self._lock:
+            self._entries.pop((bucket, key), None)
+            try:
+                os.remove(self._path(bucket, key))
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """In-memory hits, 304 revalidations and full downloads."""
+        return {"hits": self.hits, "revalidations": self.revalidations, "downloads": self.downloads}
+
+
+def _is_not_modified(error: Exception) -> bool:
+    """Whether a botocore ClientError is the 304 answer to IfNoneMatch."""
+    response = getattr(error, "response", None) or {}
+    status = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    code = response.get("Error", {}).get("Code")
+    return status == 304 or code in ("304", "NotModified")
+
+
+SESSION_DATA_CACHE = S3JsonCache(
+    directory=os.getenv("SESSION_CACHE_DIR", "/tmp/session_data_cache"),
+    ttl=float(os.getenv("SESSION_CACHE_TTL", "300")),
+)
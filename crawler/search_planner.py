@@ -0,0 +1,153 @@
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from crawler.zillow_records import SearchResponse, SoldHome
+
+
+def split_bounds(bounds: Dict[str, float]) -> List[Dict[str, float]]:
+    """Split map bounds into four equal quadrants (NW, NE, SW, SE)."""
+    mid_lat = (bounds["north"] + bounds["south"]) / 2
+    mid_lng = (bounds["west"] + bounds["east"]) / 2
+    return [
+        {"north": bounds["north"], "south": mid_lat, "west": bounds["west"], "east": mid_lng},
+        {"north": bounds["north"], "south": mid_lat, "west": mid_lng, "east": bounds["east"]},
+        {"north": mid_lat, "south": bounds["south"], "west": bounds["west"], "east": mid_lng},
+        {"north": mid_lat, "south": bounds["south"], "west": mid_lng, "east": bounds["east"]},
+    ]
+
+
+class ZillowSearchPlanner:
+    """
+    Covers a Zillow map search that spans more than one results page.
+
+    Zillow's search-page-state endpoint only returns one page of list results
+    per request, so instead of paginating the planner recursively splits the
+    payload's searchQueryState.mapBounds into quadrant tiles until each tile
+    fits on a single page. Sibling tiles are fetched concurrently and homes
+    are deduplicated by zpid, since results on a tile border can show up in
+    both tiles. Tiles still overflowing at max_depth fall back to paging.
+
+    Args:
+        fetch: Callable taking a search payload and returning a decoded
+            response with total_pages and list_results (see SearchResponse)
+        max_depth: Maximum number of times a tile is split
+        max_workers: Tiles fetched concurrently
+        max_pages: Page limit for the pagination fallback
+
+    Example:
+        planner = ZillowSearchPlanner(crawler.fetch_search_page, max_workers=4)
+        homes = planner.fetch(search_data)
+        planner.tiles_fetched  # requests used to cover the search
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Dict], SearchResponse],
+        max_depth: int = 6,
+        max_workers: int = 4,
+        max_pages: int = 20,
+    ):
+        self.fetch_page = fetch
+        self.max_depth = max_depth
+        self.max_workers = max_workers
+        self.max_pages = max_pages
+        self.tiles_fetched = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def with_bounds(data: Dict, bounds: Dict[str, float]) -> Dict:
+        """Copy of the search payload restricted to bounds, starting at page one."""
+        tile = copy.deepcopy(data)
+        state = tile["searchQueryState"]
+        state["mapBounds"] = bounds
+        state["isMapVisible"] = True
+        state["pagination"] = {}
+        return tile
+
+    def fetch(self, data: Dict) -> List[SoldHome]:
+        """
+        Fetch every result of a search, tiling its map bounds as needed.
+
+        Args:
+            data: Search payload with searchQueryState.mapBounds
+
+        Returns:
+            The list results of every tile, deduplicated by zpid
+        """
+        self.tiles_fetched = 0
+        first = self._fetch(data)
+        results = first.list_results
+        if first.total_pages > 1:
+            if "mapBounds" not in data.get("searchQueryState", {}):
+                raise Exception("Search payload has no mapBounds to split")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                self._executor = executor
+                try:
+                    results = self._split(data, data["searchQueryState"]["mapBounds"])
+                finally:
+                    self._executor = None
+        return self._dedupe(results)
+
+    def _fetch(self, data: Dict) -> SearchResponse:
+        # Called from the executor's threads; += on an attribute isn't atomic
+        with self._lock:
+            self.tiles_fetched += 1
+        return self.fetch_page(data)
+
+    def _split(self, data: Dict, bounds: Dict[str, float]) -> List[SoldHome]:
+        """
+        Tile bounds breadth first: each level's overflowing tiles are split
+        into quadrants and the whole next level is fetched concurrently.
+        """
+        results = []
+        pending = [bounds]
+        for depth in range(1, self.max_depth + 1):
+            tiles = [
+                self.with_bounds(data, quadrant)
+                for parent in pending
+                for quadrant in split_bounds(parent)
+            ]
+            pending = []
+            overflowing = []
+            for tile, response in zip(tiles, self._executor.map(self._fetch, tiles)):
+                pages = response.total_pages
+                if pages <= 1:
+                    results.extend(response.list_results)
+                elif depth < self.max_depth:
+                    pending.append(tile["searchQueryState"]["mapBounds"])
+                else:
+                    results.extend(response.list_results)
+                    overflowing.append((tile, pages))
+            for tile, pages in overflowing:
+                results.extend(self._paginate(tile, pages))
+            if not pending:
+                break
+        return results
+
+    def _paginate(self, tile: Dict, pages: int) -> List[SoldHome]:
+        """Fetch pages 2..pages of a tile that can't be split any further."""
+        requests = []
+        for page in range(2, min(pages, self.max_pages) + 1):
+            request = copy.deepcopy(tile)
+            request["searchQueryState"]["pagination"] = {"currentPage": page}
+            requests.append(request)
+        results = []
+        for response in self._executor.map(self._fetch, requests):
+            results.extend(response.list_results)
+        return results
+
+    @staticmethod
+    def _dedupe(results: List[SoldHome]) -> List[SoldHome]:
+        seen = set()
+        unique = []
+        for result in results:
+            zpid = result.zpid
+            if zpid is not None:
+                if zpid in seen:
+                    continue
+                seen.add(zpid)
+            unique.append(result)
+        return unique
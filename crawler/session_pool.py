@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+
+
+class SessionPool:
+    """
+    Module-scope pool of warm crawler sessions.
+
+    Lambda keeps module globals alive between warm invocations, so sessions
+    kept here reuse their TLS connections and the cookies Zillow handed back
+    on earlier requests instead of rebuilding both every invocation.
+    Sessions are evicted when idle for longer than max_idle, older than
+    max_age, flagged as blocked (session.blocked), or least recently used
+    once the pool holds more than max_size sessions.
+
+    Example:
+        session = SESSION_POOL.get(("Zillow", "chrome", city), build_session)
+    """
+
+    def __init__(self, max_idle: float = 900, max_age: float = 3600, max_size: int = 16):
+        self.max_idle = max_idle
+        self.max_age = max_age
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _is_stale(self, entry: Dict, now: float) -> bool:
+        return (
+            getattr(entry["session"], "blocked", False)
+            or now - entry["last_used"] > self.max_idle
+            or now - entry["created_at"] > self.max_age
+        )
+
+    def _evict(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self.evictions += 1
+        try:
+            entry["session"].close()
+        except Exception as e:
+            print(f"Error closing pooled session {key}: {e}")
+
+    def get(self, key: Hashable, factory: Callable[[], object]):
+        """Get the warm session for key, building it with factory if needed."""
+        now = time.monotonic()
+        with self._lock:
+            stale_keys = [k for k, e in self._entries.items() if self._is_stale(e, now)]
+            for stale_key in stale_keys:
+                self._evict(stale_key)
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["last_used"] = now
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry["session"]
+            self.misses += 1
+
+        session = factory()
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = {"session": session, "created_at": now, "last_used": now}
+            while len(self._entries) > self.max_size:
+                self._evict(next(iter(self._entries)))
+        return session
+
+    def discard(self, key: Hashable):
+        """Drop and close the session for key, e.g. after it was blocked."""
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+
+    def clear(self):
+        """Drop and close every pooled session."""
+        with self._lock:
+            for key in list(self._entries):
+                self._evict(key)
+
+    def stats(self) -> Dict[str, int]:
+        """Pool size and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+SESSION_POOL = SessionPool(
+    max_idle=float(os.getenv("SESSION_POOL_MAX_IDLE", "900")),
+    max_age=float(os.getenv("SESSION_POOL_MAX_AGE", "3600")),
+    max_size=int(os.getenv("SESSION_POOL_MAX_SIZE", "16")),
+)
@@ -1,10 +1,24 @@
 from curl_cffi.requests import Session
-from typing import Dict
+from typing import Dict, Optional
 
-class SimpleCrawler(Session):
+from crawler.concurrency import AdaptiveConcurrencyMixin, AIMDController
+from crawler.http_cache import HttpCache, HttpCacheMixin
+from crawler.rate_limiter import RateLimiter, RateLimitMixin
 
-    def __init__(self, impersonate="chrome"):
+
+class SimpleCrawler(HttpCacheMixin, RateLimitMixin, AdaptiveConcurrencyMixin, Session):
+
+    def __init__(
+        self,
+        impersonate="chrome",
+        http_cache: Optional[HttpCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        concurrency_controller: Optional[AIMDController] = None,
+    ):
         super().__init__(impersonate=impersonate)
+        self.http_cache = http_cache or HttpCache.from_env()
+        self.rate_limiter = rate_limiter
+        self.concurrency_controller = concurrency_controller
         self.headers.update(
             {
                 "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36"
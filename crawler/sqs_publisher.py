@@ -0,0 +1,92 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from crawler.aws_clients import sqs_client
+from crawler.retry import RetryPolicy
+
+# SQS rejects batches with more than 10 entries
+SQS_MAX_BATCH_SIZE = 10
+
+
+class SqsBatchPublisher:
+    """
+    Publishes messages to an SQS queue in concurrent batches of 10.
+
+    Each chunk of messages goes out as one send_message_batch call, chunks
+    are sent from a thread pool, and entries SQS reports as failed in a
+    partial failure are retried on their own with jittered backoff. Sender
+    faults (invalid messages) are not retried.
+
+    Args:
+        queue_url: URL of the target queue
+        client: boto3-compatible SQS client; defaults to the shared sqs_client()
+        max_workers: Batches sent concurrently
+        retry_policy: Attempts and backoff for failed entries
+
+    Example:
+        publisher = SqsBatchPublisher(queue_url)
+        result = publisher.publish({"zpid": zpid} for zpid in zpids)
+        result["failed"]  # messages that could not be delivered
+    """
+
+    def __init__(
+        self,
+        queue_url: str,
+        client=None,
+        max_workers: int = 8,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        self.queue_url = queue_url
+        self.client = client or sqs_client()
+        self.max_workers = max_workers
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=3, base_delay=0.2, max_delay=5)
+
+    def publish(self, messages: Iterable[Dict]) -> Dict[str, List]:
+        """
+        Send every message, JSON-encoded, as one SQS message each.
+
+        Returns:
+            {"sent": count, "failed": [message, ...]}
+        """
+        bodies = [json.dumps(message) for message in messages]
+        batches = [
+            bodies[i:i + SQS_MAX_BATCH_SIZE] for i in range(0, len(bodies), SQS_MAX_BATCH_SIZE)
+        ]
+        if not batches:
+            return {"sent": 0, "failed": []}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            failed = [body for batch_failed in executor.map(self._send_batch, batches) for body in batch_failed]
+        return {
+            "sent": len(bodies) - len(failed),
+            "failed": [json.loads(body) for body in failed],
+        }
+
+    def _send_batch(self, bodies: List[str]) -> List[str]:
+        """Send one batch, retrying failed entries; returns bodies never delivered."""
+        pending = {str(i): body for i, body in enumerate(bodies)}
+        rejected = []
+        policy = self.retry_policy
+        for attempt in range(policy.max_retries):
+            try:
+                response = self.client.send_message_batch(
+                    QueueUrl=self.queue_url,
+                    Entries=[{"Id": entry_id, "MessageBody": body} for entry_id, body in pending.items()],
+                )
+            except Exception as e:
+                print(f"Error sending SQS batch (attempt {attempt + 1}/{policy.max_retries}): {e}")
+            else:
+                retryable = {}
+                for failure in response.get("Failed", []):
+                    if failure.get("SenderFault"):
+                        print(f"SQS rejected message: {failure.get('Code')} {failure.get('Message')}")
+                        rejected.append(pending[failure["Id"]])
+                    else:
+                        retryable[failure["Id"]] = pending[failure["Id"]]
+                pending = retryable
+                if not pending:
+                    return rejected
+            if attempt < policy.max_retries - 1:
+                policy.wait(policy.backoff(attempt))
+        return rejected + list(pending.values())
@@ -0,0 +1,116 @@
+"""
+Measure cold and warm start cost of a Lambda entry module.
+
+Cold starts are simulated by importing the module in a fresh interpreter
+with `-X importtime`, which also gives the import time of every module it
+pulls in. Warm starts import the module again in a process that already has
+it loaded, and call each factory twice to show what module-level caching
+saves on reuse.
+
+Example:
+    python -m crawler.startup_benchmark aws.zillow.zillow --runs 5 --top 15
+    python -m crawler.startup_benchmark aws.zillow.zillow \
+        --factory crawler.aws_clients:s3_client
+"""
+import argparse
+import importlib
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+
+def cold_import(module: str) -> Tuple[float, Dict[str, int]]:
+    """
+    Import module in a fresh interpreter.
+
+    Returns:
+        Wall time in seconds and the self import time (us) of each module loaded
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    self_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        self_times[name.strip()] = int(self_us)
+    return elapsed, self_times
+
+
+def warm_import(module: str) -> Tuple[float, float]:
+    """Seconds for the first in-process import of module and for a repeat."""
+    started = time.perf_counter()
+    importlib.import_module(module)
+    first = time.perf_counter() - started
+    started = time.perf_counter()
+    importlib.import_module(module)
+    return first, time.perf_counter() - started
+
+
+def time_factory(path: str) -> Tuple[float, float]:
+    """Seconds for the first and second call of a `module:function` factory."""
+    module, name = path.split(":")
+    factory = getattr(importlib.import_module(module), name)
+    timings = []
+    for _ in range(2):
+        started = time.perf_counter()
+        factory()
+        timings.append(time.perf_counter() - started)
+    return timings[0], timings[1]
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("module", help="Entry module to import, e.g. aws.zillow.zillow")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to measure")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imported modules to list")
+    parser.add_argument(
+        "--factory",
+        action="append",
+        default=[],
+        help="module:function called twice to measure warm reuse (repeatable)",
+    )
+    args = parser.parse_args(argv)
+
+    baseline = statistics.median(cold_import("sys")[0] for _ in range(args.runs))
+    walls = []
+    module_times: Dict[str, List[int]] = {}
+    for _ in range(args.runs):
+        wall, self_times = cold_import(args.module)
+        walls.append(wall)
+        for name, us in self_times.items():
+            module_times.setdefault(name, []).append(us)
+
+    print(f"Cold start: {args.module} ({args.runs} runs)")
+    print(f"  interpreter startup  {baseline * 1000:8.1f} ms")
+    print(f"  with import          {statistics.median(walls) * 1000:8.1f} ms (median)")
+    print(f"  import only          {(statistics.median(walls) - baseline) * 1000:8.1f} ms")
+    print(f"\nSlowest modules by self import time (median of {args.runs}):")
+    slowest = sorted(
+        ((statistics.median(times), name) for name, times in module_times.items()),
+        reverse=True,
+    )[: args.top]
+    for us, name in slowest:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    first, repeat = warm_import(args.module)
+    print(f"\nWarm start: {args.module}")
+    print(f"  first import         {first * 1000:8.1f} ms")
+    print(f"  repeat import        {repeat * 1000:8.3f} ms")
+    for path in args.factory:
+        first, second = time_factory(path)
+        print(f"  {path}: first {first * 1000:.1f} ms, reused {second * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional
+
+# Seen keys are kept for sales up to this long before the city's newest sale
+DEFAULT_RETENTION_MS = 180 * 24 * 60 * 60 * 1000
+
+
+def _date_sold(home) -> int:
+    return home.hdp_data.home_info.date_sold or 0
+
+
+def home_key(home) -> str:
+    """Short hash of a home's unique key in the homes table."""
+    raw = "|".join(
+        str(part)
+        for part in (home.address_city, home.address_street, home.address_state, _date_sold(home))
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class CitySyncState:
+    """
+    What a city's previous syncs already stored.
+
+    Attributes:
+        max_date_sold: High-water mark, the newest date_sold (ms) stored so far
+        result_digest: Digest of the last search result set
+        seen: Key hash -> date_sold for homes stored within the retention window
+    """
+
+    def __init__(self, max_date_sold: int = 0, result_digest: Optional[str] = None, seen: Optional[Dict[str, int]] = None):
+        self.max_date_sold = max_date_sold
+        self.result_digest = result_digest
+        self.seen = seen or {}
+
+    @staticmethod
+    def digest(homes: Iterable) -> str:
+        """Order-independent digest of a result set's home keys."""
+        keys = sorted(home_key(home) for home in homes)
+        return hashlib.sha256(",".join(keys).encode("utf-8")).hexdigest()
+
+    def filter_new(self, homes: List, retention_ms: int = DEFAULT_RETENTION_MS) -> List:
+        """
+        Drop homes an earlier sync already stored.
+
+        Homes sold before the retention window (relative to the high-water
+        mark) were covered by earlier syncs and are dropped as well.
+        """
+        cutoff = self.max_date_sold - retention_ms
+        return [
+            home for home in homes
+            if home_key(home) not in self.seen and _date_sold(home) >= cutoff
+        ]
+
+    def record(self, homes: Iterable, result_digest: str, retention_ms: int = DEFAULT_RETENTION_MS):
+        """Remember homes as stored and prune keys that fell out of the window."""
+        for home in homes:
+            date_sold = _date_sold(home)
+            self.seen[home_key(home)] = date_sold
+            self.max_date_sold = max(self.max_date_sold, date_sold)
+        self.result_digest = result_digest
+        cutoff = self.max_date_sold - retention_ms
+        self.seen = {key: date_sold for key, date_sold in self.seen.items() if date_sold >= cutoff}
+
+    def to_dict(self) -> Dict:
+        return {
+            "max_date_sold": self.max_date_sold,
+            "result_digest": self.result_digest,
+            "seen": self.seen,
+        }
+
+
+class SyncStateStore:
+    """
+    Per-city sync state kept in memory and in one JSON file per city.
+
+    The files live in `directory` (e.g. /tmp on Lambda), so the state survives
+    warm invocations for free and is simply rebuilt by a full sync after a
+    cold start or if the directory is wiped. State only ever lets a sync skip
+    rows the database already has, so losing it costs a round trip, never data.
+
+    Example:
+        state = SYNC_STATE.load("Collingswood")
+        new_homes = state.filter_new(homes)
+        ...
+        state.record(homes, CitySyncState.digest(homes))
+        SYNC_STATE.save("Collingswood", state)
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._states: Dict[str, CitySyncState] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, city: str) -> str:
+        filename = re.sub(r"[^\w.-]", "_", city.lower())
+        return os.path.join(self.directory, f"{filename}.json")
+
+    def load(self, city: str) -> CitySyncState:
+        """Get the city's state, empty if it has never been synced."""
+        with self._lock:
+            state = self._states.get(city)
+            if state is None:
+                try:
+                    with open(self._path(city)) as f:
+                        state = CitySyncState(**json.load(f))
+                except (OSError, ValueError, TypeError):
+                    state = CitySyncState()
+                self._states[city] = state
+            return state
+
+    def save(self, city: str, state: CitySyncState):
+        """Persist the city's state after a successful sync."""
+        with self._lock:
+            self._states[city] = state
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(city)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state.to_dict(), f)
+            os.replace(tmp_path, path)
+
+    def clear(self, city: str):
+        """Forget a city's state, forcing its next sync to be a full one."""
+        with self._lock:
+            self._states.pop(city, None)
+            try:
+                os.remove(self._path(city))
+            except OSError:
+                pass
+
+
+SYNC_STATE = SyncStateStore(os.getenv("SYNC_STATE_DIR", "/tmp/zillow_sync_state"))
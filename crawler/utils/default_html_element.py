@@ -1,11 +1,16 @@
 from typing import Dict, List
 
+from lxml import html
 from lxml.html import HtmlElement
 
+from crawler.utils.xpath_cache import compile_xpath
+
 
 class DefaultHtmlElement:
     """Mixin class providing custom methods for HtmlElement instances."""
 
+    is_empty = False
+
     def content(self) -> str:
         """Get the text content of the element, stripped of whitespace."""
         text = self.text_content()
@@ -20,20 +25,12 @@ class DefaultHtmlElement:
             index: Index of element to retrieve (0 for first, -1 for last)
 
         Returns:
-            HtmlElement with is_empty attribute set
+            Matching element, or the shared EMPTY_ELEMENT (is_empty=True) on a miss
         """
-        # Import here to avoid circular import
-        from crawler.utils.xpath_utils import map_lxml_html_to_custom_html_element
-
-        elements = self.xpath(path)
+        elements = compile_xpath(path)(self)
         if not elements:
-            element = map_lxml_html_to_custom_html_element(HtmlElement())
-            element.is_empty = True
-            return element
-
-        element = map_lxml_html_to_custom_html_element(elements[index])
-        element.is_empty = False
-        return element
+            return EMPTY_ELEMENT
+        return elements[index]
 
     def first(self, path: str) -> HtmlElement:
         """Get the first element matching the xpath."""
@@ -45,16 +42,7 @@ class DefaultHtmlElement:
 
     def elements(self, path: str) -> List[HtmlElement]:
         """Get all elements matching the xpath."""
-        # Import here to avoid circular import
-        from crawler.utils.xpath_utils import map_lxml_html_to_custom_html_element
-
-        elements = self.xpath(path)
-        result = []
-        for element in elements:
-            element = map_lxml_html_to_custom_html_element(element)
-            element.is_empty = False
-            result.append(element)
-        return result
+        return compile_xpath(path)(self)
 
     def json(self) -> Dict:
         """Get JSON data attached to this element (from response)."""
@@ -69,3 +57,61 @@ class DefaultHtmlElement:
             if name:  # Only add if name exists
                 _data[name] = value
         return _data
+
+
+class CustomHtmlElement(DefaultHtmlElement, HtmlElement):
+    """HtmlElement with the DefaultHtmlElement methods, used for all parsed tags."""
+
+
+class _CustomHtmlElementClassLookup(html.HtmlElementClassLookup):
+    """
+    Element class lookup that mixes DefaultHtmlElement into every element.
+
+    HtmlElementClassLookup only applies '*' mixins to its special classes
+    (form, input, select, ...), so plain tags fall back to CustomHtmlElement.
+    """
+
+    def __init__(self):
+        super().__init__(mixins=[("*", DefaultHtmlElement)])
+
+    def lookup(self, node_type, document, namespace, name):
+        if node_type == "element":
+            return self._element_classes.get(name.lower(), CustomHtmlElement)
+        return super().lookup(node_type, document, namespace, name)
+
+
+# Parser whose elements are created as DefaultHtmlElement subclasses directly
+HTML_PARSER = html.HTMLParser()
+HTML_PARSER.set_element_class_lookup(_CustomHtmlElementClassLookup())
+
+
+class _EmptyHtmlElement(CustomHtmlElement):
+    """Immutable element returned by first()/last() when nothing matches."""
+
+    is_empty = True
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("EMPTY_ELEMENT is a shared sentinel and cannot be modified")
+
+    set = append = extend = insert = remove = clear = _read_only
+    __setitem__ = __delitem__ = __setattr__ = _read_only
+
+    @property
+    def text(self):
+        return None
+
+    @text.setter
+    def text(self, value):
+        self._read_only()
+
+    @property
+    def tail(self):
+        return None
+
+    @tail.setter
+    def tail(self, value):
+        self._read_only()
+
+
+# Shared sentinel for xpath misses; check `element.is_empty` rather than identity
+EMPTY_ELEMENT = _EmptyHtmlElement()
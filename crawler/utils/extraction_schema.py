@@ -0,0 +1,150 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from lxml import etree
+from lxml.html import HtmlElement
+
+from crawler.utils.xpath_utils import LazyResponse
+
+
+class Field:
+    """
+    A single column of an ExtractionSchema.
+
+    Args:
+        path: XPath (or CSS selector when css=True) relative to the record node
+        converter: Callable applied to the extracted string, e.g. int or float
+        attr: Attribute to read from the matched element instead of its text
+        css: Treat path as a CSS selector (requires the cssselect package)
+        default: Value used when nothing matches or the converter fails
+        numeric: Store the column as a NumPy array when extracting with
+            as_numpy=True (inferred for int/float converters)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        converter: Optional[Callable[[str], Any]] = None,
+        attr: Optional[str] = None,
+        css: bool = False,
+        default: Any = None,
+        numeric: Optional[bool] = None,
+    ):
+        self.path = _css_to_xpath(path) if css else path
+        self.converter = converter
+        self.attr = attr
+        self.default = default
+        self.numeric = converter in (int, float) if numeric is None else numeric
+        self.compiled = etree.XPath(self.path)
+
+    def extract(self, node: HtmlElement) -> Any:
+        """Extract and convert this field's value from a record node."""
+        matches = self.compiled(node)
+        if not matches:
+            return self.default
+
+        match = matches[0]
+        if isinstance(match, str):
+            # The xpath selected text or an attribute directly
+            value = str(match).strip()
+        elif self.attr:
+            value = match.get(self.attr)
+        else:
+            value = (match.text_content() or "").strip()
+
+        if value is None or value == "":
+            return self.default
+        if self.converter is None:
+            return value
+        try:
+            return self.converter(value)
+        except (TypeError, ValueError):
+            return self.default
+
+
+class ExtractionSchema:
+    """
+    Declarative mapping of field names to selectors, compiled once.
+
+    Results are columnar (a dict of lists) so a page of listing cards can be
+    fed straight into bulk inserts without building a dict per record.
+
+    Args:
+        fields: Mapping of field name to an XPath string or a Field
+        root: XPath selecting the record nodes in each page (e.g. listing
+            cards). When omitted each page is a single record.
+
+    Example:
+        schema = ExtractionSchema(
+            {
+                "address": ".//address",
+                "price": Field(".//span[@data-test='price']", converter=parse_price),
+                "url": Field(".//a", attr="href"),
+            },
+            root="//article[@data-test='property-card']",
+        )
+        columns = schema.extract_many(pages, as_numpy=True)
+    """
+
+    def __init__(self, fields: Dict[str, Union[str, Field]], root: Optional[str] = None):
+        self.fields = {
+            name: field if isinstance(field, Field) else Field(field)
+            for name, field in fields.items()
+        }
+        self.root = etree.XPath(root) if root else None
+
+    def _records(self, page) -> List[HtmlElement]:
+        element = page.element if isinstance(page, LazyResponse) else page
+        if self.root is None:
+            return [element]
+        return self.root(element)
+
+    def extract(self, page, as_numpy: bool = False) -> Dict[str, Any]:
+        """Extract all records from a single page into columns."""
+        return self.extract_many([page], as_numpy=as_numpy)
+
+    def extract_many(self, pages: Iterable, as_numpy: bool = False) -> Dict[str, Any]:
+        """
+        Extract all records from many pages into columns.
+
+        Args:
+            pages: Responses returned by Crawler or parsed HtmlElements
+            as_numpy: Convert numeric fields into NumPy arrays (missing values
+                become NaN)
+
+        Returns:
+            Dict of field name to a list (or array) with one value per record
+        """
+        fields = list(self.fields.items())
+        columns: Dict[str, List[Any]] = {name: [] for name, _ in fields}
+        for page in pages:
+            for record in self._records(page):
+                for name, field in fields:
+                    columns[name].append(field.extract(record))
+
+        if as_numpy:
+            try:
+                import numpy as np
+            except ImportError:
+                raise ImportError("numpy is required for as_numpy=True: pip install numpy") from None
+
+            for name, field in fields:
+                if not field.numeric:
+                    continue
+                values = columns[name]
+                if field.converter is int and None not in values:
+                    columns[name] = np.array(values, dtype=int)
+                else:
+                    columns[name] = np.array(
+                        [np.nan if value is None else value for value in values],
+                        dtype=float,
+                    )
+        return columns
+
+
+def _css_to_xpath(selector: str) -> str:
+    """Translate a CSS selector into an XPath relative to the current node."""
+    try:
+        from cssselect import HTMLTranslator
+    except ImportError:
+        raise ImportError("cssselect is required for CSS selectors: pip install cssselect") from None
+    return HTMLTranslator().css_to_xpath(selector)
@@ -0,0 +1,77 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict
+
+from lxml import etree
+
+
+class XPathCache:
+    """
+    Process-wide LRU cache of compiled lxml XPath objects.
+
+    Scrapers evaluate the same few selectors over and over, so compiling each
+    selector once and reusing the compiled object skips re-parsing the
+    expression on every first()/last()/elements() call.
+
+    Example:
+        cache = XPathCache(maxsize=256)
+        links = cache.get(".//a[@href]")(page)
+        cache.stats()  # {'size': 1, 'maxsize': 256, 'hits': 0, ...}
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._compiled: "OrderedDict[str, etree.XPath]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> etree.XPath:
+        """Get the compiled XPath for path, compiling and caching it on a miss."""
+        with self._lock:
+            compiled = self._compiled.get(path)
+            if compiled is not None:
+                self._compiled.move_to_end(path)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        # Compile outside the lock; invalid expressions raise XPathSyntaxError
+        compiled = etree.XPath(path)
+
+        with self._lock:
+            self._compiled[path] = compiled
+            self._compiled.move_to_end(path)
+            while len(self._compiled) > self.maxsize:
+                self._compiled.popitem(last=False)
+                self.evictions += 1
+        return compiled
+
+    def clear(self):
+        """Drop all compiled expressions and reset the counters."""
+        with self._lock:
+            self._compiled.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Get the cache size, limit and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "size": len(self._compiled),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+XPATH_CACHE = XPathCache(maxsize=int(os.getenv("CRAWLER_XPATH_CACHE_SIZE", "1024")))
+
+
+def compile_xpath(path: str) -> etree.XPath:
+    """Get the compiled XPath for path from the process-wide cache."""
+    return XPATH_CACHE.get(path)
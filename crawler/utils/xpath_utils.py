@@ -1,50 +1,85 @@
-import types
+from typing import Any
 
 from lxml import html
 from lxml.html import HtmlElement
 from requests import Response
 
-from crawler.utils.default_html_element import DefaultHtmlElement
+from crawler.utils.default_html_element import HTML_PARSER
 
 
-# Cache custom functions to avoid repeated dir() calls
-_CUSTOM_FUNCTIONS = None
+# Sentinel marking a LazyResponse whose JSON body has not been decoded yet
+_UNPARSED = object()
 
 
-def _get_custom_functions():
-    """Get cached list of custom functions from DefaultHtmlElement."""
-    global _CUSTOM_FUNCTIONS
-    if _CUSTOM_FUNCTIONS is None:
-        _CUSTOM_FUNCTIONS = {
-            name: getattr(DefaultHtmlElement, name)
-            for name in dir(DefaultHtmlElement)
-            if not name.startswith("__") and callable(getattr(DefaultHtmlElement, name))
-        }
-    return _CUSTOM_FUNCTIONS
+class LazyResponse:
+    """
+    Response wrapper that parses its body only when it is first accessed.
 
+    The Content-Type header decides which parser is likely to succeed: JSON
+    responses are never run through lxml unless an HTML method is called, and
+    HTML responses never attempt (and fail) a JSON decode. Bodies with any
+    other Content-Type (text/plain, text/javascript, ...) are sniffed. Public
+    attributes that are not defined here are delegated to the lazily parsed
+    HtmlElement, so ``response.first(...)``/``response.elements(...)`` keep
+    working.
+    """
 
-def map_lxml_html_to_custom_html_element(element: HtmlElement) -> HtmlElement:
-    """Bind custom methods from DefaultHtmlElement to an lxml HtmlElement."""
-    custom_functions = _get_custom_functions()
-    existing_functions = set(dir(element))
+    # Set by __init__; never delegated, so copy/pickle see a missing attribute
+    # instead of recursing through element before the instance is set up
+    _OWN_ATTRIBUTES = frozenset({"raw_response", "status_code", "url", "headers", "content"})
 
-    for func_name, func in custom_functions.items():
-        if func_name not in existing_functions:
-            # Bind custom function as a method
-            element.__dict__[func_name] = types.MethodType(func, element)
+    _element = None
+    _json = _UNPARSED
 
-    return element
+    def __init__(self, raw_response: Response):
+        self.raw_response = raw_response
+        self.status_code = raw_response.status_code
+        self.url = raw_response.url
+        self.headers = raw_response.headers
+        self.content = raw_response.content
 
+    @property
+    def content_type(self) -> str:
+        """Media type from the Content-Type header, without parameters."""
+        content_type = self.headers.get("content-type") or ""
+        return content_type.split(";", 1)[0].strip().lower()
 
-def bind_custom_html_element(raw_html: Response) -> HtmlElement:
-    element = html.fromstring(raw_html.content)
-    element.status_code = raw_html.status_code
-    element.url = raw_html.url
-    element.headers = raw_html.headers
-    element.content = raw_html.content
-    try:
-        element._json = raw_html.json()
-    except Exception:
-        element._json = {}
+    def is_json(self) -> bool:
+        """Whether the body is likely JSON, sniffing it unless Content-Type says JSON or HTML."""
+        content_type = self.content_type
+        if "json" in content_type:
+            return True
+        if "html" in content_type:
+            return False
+        return self.content.lstrip()[:1] in (b"{", b"[")
 
-    return map_lxml_html_to_custom_html_element(element)
+    @property
+    def element(self) -> HtmlElement:
+        """The response body parsed as HTML, parsed on first access."""
+        if self._element is None:
+            self._element = html.fromstring(self.content, parser=HTML_PARSER)
+        return self._element
+
+    def json(self) -> Any:
+        """The response body decoded as JSON, or {} if it is not JSON."""
+        if self._json is _UNPARSED:
+            self._json = {}
+            if self.is_json():
+                try:
+                    self._json = self.raw_response.json()
+                except ValueError:
+                    pass
+        return self._json
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or name in self._OWN_ATTRIBUTES:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        return getattr(self.element, name)
+
+    def __repr__(self) -> str:
+        return f"<LazyResponse [{self.status_code}] {self.url}>"
+
+
+def bind_custom_html_element(raw_html: Response) -> LazyResponse:
+    """Wrap a response so its HTML/JSON body is parsed lazily on first access."""
+    return LazyResponse(raw_html)
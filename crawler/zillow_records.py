@@ -0,0 +1,117 @@
+from typing import List, Optional, Tuple, Union
+
+import msgspec
+
+Number = Union[int, float, None]
+
+
+class HomeInfo(msgspec.Struct, rename="camel"):
+    """The hdpData.homeInfo fields of a search result we store."""
+
+    zpid: Optional[int] = None
+    date_sold: Optional[int] = None
+    days_on_zillow: Optional[int] = None
+    home_type: Optional[str] = None
+    zestimate: Number = None
+    lot_area_value: Number = None
+    lot_area_unit: Optional[str] = None
+    tax_assessed_value: Number = None
+
+
+class HdpData(msgspec.Struct, rename="camel"):
+    home_info: HomeInfo = msgspec.field(default_factory=HomeInfo)
+
+
+class SoldHome(msgspec.Struct, rename="camel"):
+    """
+    One recently sold home from a search page's listResults.
+
+    Only the fields we store are declared; everything else in the payload is
+    skipped by the decoder without being materialized.
+    """
+
+    detail_url: Optional[str] = None
+    sold_price: Union[str, int, float, None] = None
+    price: Union[str, int, float, None] = None
+    unformatted_price: Number = None
+    address_city: Optional[str] = None
+    address_street: Optional[str] = None
+    address_state: Optional[str] = None
+    address_zipcode: Optional[str] = None
+    bathrooms: Number = None
+    bedrooms: Number = None
+    living_area: Number = None
+    hdp_data: HdpData = msgspec.field(default_factory=HdpData)
+
+    # Column order of the homes table insert in Zillow._save_to_database
+    COLUMNS = (
+        "url", "sold_price", "raw_sold_price",
+        "address_city", "address_street", "address_state", "address_zipcode",
+        "date_sold", "bedrooms", "bathrooms", "sqft",
+        "days_on_market", "type", "zestimate",
+        "lot_size", "lot_size_unit", "tax_assessment", "zpid",
+    )
+
+    @property
+    def zpid(self) -> Optional[int]:
+        return self.hdp_data.home_info.zpid
+
+    def to_row(self) -> Tuple:
+        """Parameters for the homes insert, in COLUMNS order."""
+        info = self.hdp_data.home_info
+        return (
+            self.detail_url,
+            self.sold_price,
+            self.price or self.unformatted_price,
+            self.address_city,
+            self.address_street,
+            self.address_state,
+            self.address_zipcode,
+            info.date_sold,
+            self.bedrooms,
+            self.bathrooms,
+            self.living_area,
+            info.days_on_zillow,
+            info.home_type,
+            info.zestimate,
+            info.lot_area_value,
+            info.lot_area_unit,
+            info.tax_assessed_value,
+            info.zpid,
+        )
+
+
+class SearchList(msgspec.Struct, rename="camel"):
+    total_pages: int = 0
+
+
+class SearchResults(msgspec.Struct, rename="camel"):
+    list_results: List[SoldHome] = []
+
+
+class Cat1(msgspec.Struct, rename="camel"):
+    search_list: SearchList = msgspec.field(default_factory=SearchList)
+    search_results: SearchResults = msgspec.field(default_factory=SearchResults)
+
+
+class SearchResponse(msgspec.Struct):
+    """A search-page-state response, reduced to what the crawler reads."""
+
+    cat1: Cat1 = msgspec.field(default_factory=Cat1)
+
+    @property
+    def total_pages(self) -> int:
+        return self.cat1.search_list.total_pages
+
+    @property
+    def list_results(self) -> List[SoldHome]:
+        return self.cat1.search_results.list_results
+
+
+# Decoders are reusable and thread-safe; building one compiles the schema
+_SEARCH_RESPONSE_DECODER = msgspec.json.Decoder(SearchResponse)
+
+
+def decode_search_response(content: bytes) -> SearchResponse:
+    """Decode a raw search response body in a single pass."""
+    return _SEARCH_RESPONSE_DECODER.decode(content)
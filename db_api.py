@@ -1,6 +1,6 @@
 import os
 import psycopg2
-from psycopg2.extras import execute_batch
+from psycopg2.extras import execute_batch, execute_values
 from typing import List, Tuple, Optional, Any
 
 
@@ -72,12 +72,33 @@ class DBAPI:
         execute_batch(self.cursor, query, values)
         return self.cursor.rowcount
 
-    def execute_many_with_returning(self, query: str, values: List[Tuple]) -> List[Any]:
-        """Execute multiple inserts and collect all RETURNING values"""
+    def execute_many_with_returning(self, query: str, values: List[Tuple], page_size: int = 1000) -> List[Any]:
+        """
+        Execute a multi-row insert and collect all RETURNING values.
+
+        The query takes a single `VALUES %s` placeholder, which is expanded by
+        execute_values so each page of rows goes out in one round trip. If the
+        batch fails, it is rolled back to a savepoint and the rows are retried
+        one at a time, so only the offending rows are skipped.
+        """
+        self.cursor.execute("SAVEPOINT execute_many")
+        try:
+            results = execute_values(self.cursor, query, values, page_size=page_size, fetch=True)
+            self.cursor.execute("RELEASE SAVEPOINT execute_many")
+            return results
+        except psycopg2.Error as e:
+            self.cursor.execute("ROLLBACK TO SAVEPOINT execute_many")
+            self.cursor.execute("RELEASE SAVEPOINT execute_many")
+            print(f"Batch insert failed, retrying row by row: {e}")
+
         results = []
         for value_tuple in values:
-            self.cursor.execute(query, value_tuple)
-            result = self.cursor.fetchone()
-            if result:
-                results.append(result)
+            self.cursor.execute("SAVEPOINT execute_many_row")
+            try:
+                results.extend(execute_values(self.cursor, query, [value_tuple], fetch=True))
+                self.cursor.execute("RELEASE SAVEPOINT execute_many_row")
+            except psycopg2.Error as e:
+                self.cursor.execute("ROLLBACK TO SAVEPOINT execute_many_row")
+                self.cursor.execute("RELEASE SAVEPOINT execute_many_row")
+                print(f"Error inserting row: {e}")
         return results
@@ -1,9 +1,10 @@
-import json
-import time
-from random import randint
+from crawler.graphql_client import property_payload
 from db_api import DBAPI
 from local.zillow.zillow import Zillow
 
+# Property fields backfill reads, which decide the query profile it uses
+PROPERTY_FIELDS = ("livingArea", "bedrooms", "bathrooms")
+
 
 def backfill(zillow, zpid, **kwargs):
     headers = {
@@ -22,24 +23,9 @@ def backfill(zillow, zpid, **kwargs):
         'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36',
         'x-z-enable-oauth-conversion': 'true',
     }
-    variables = {
-        "zpid": zpid,
-        "altId": None,
-        "deviceType": "desktop",
-        "deviceTypeV2": "WEB_DESKTOP",
-        "useOmpV2": True,
-        "includeLastSoldListing": False
-    }
-    params = {
-        'extensions': '{"persistedQuery":{"version":1,"sha256Hash":"4dae43213dc50a3fe01c15455df088f46f37ef86aa0af63b24bf0331de593bdc"}}',
-        'variables': json.dumps(variables),
-    }
     try:
-        response = zillow.get("https://www.zillow.com/graphql/", params=params, headers=headers)
-        if response.status_code != 200:
-            raise Exception(response.text)
-        data = response.json()
-        home_info = data.get("data").get("property")
+        response, data = zillow.graphql.fetch_property(zpid, PROPERTY_FIELDS, headers=headers)
+        home_info = property_payload(response, data)
         sqft = home_info.get("livingArea")
         beds = home_info.get("bedrooms")
         baths = home_info.get("bathrooms")
@@ -91,7 +77,6 @@ if __name__ == "__main__":
     for zpid, url in records:
         print(f"Processing zpid: {zpid}")
         try:
-            time.sleep(randint(1, 3))
             data = backfill(zillow, zpid, url=url)
 
             if data:
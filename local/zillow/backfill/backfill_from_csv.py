@@ -1,12 +1,16 @@
 import csv
-import json
 import re
-import time
-from random import randint
 from datetime import datetime
+from crawler.graphql_client import property_payload
 from db_api import DBAPI
 from local.zillow.zillow import Zillow
 
+# Property fields backfill reads, which decide the query profile it uses
+PROPERTY_FIELDS = (
+    "daysOnZillow", "homeType", "zestimate", "lotAreaValue", "lotAreaUnit",
+    "taxHistory", "priceHistory",
+)
+
 
 def backfill(zillow, zpid, **kwargs):
     headers = {
@@ -25,18 +29,6 @@ def backfill(zillow, zpid, **kwargs):
         'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36',
         'x-z-enable-oauth-conversion': 'true',
     }
-    variables = {
-        "zpid": zpid,
-        "altId": None,
-        "deviceType": "desktop",
-        "deviceTypeV2": "WEB_DESKTOP",
-        "useOmpV2": True,
-        "includeLastSoldListing": False
-    }
-    params = {
-        'extensions': '{"persistedQuery":{"version":1,"sha256Hash":"4dae43213dc50a3fe01c15455df088f46f37ef86aa0af63b24bf0331de593bdc"}}',
-        'variables': json.dumps(variables),
-    }
     """
     Looking for the following fields:
     - Tax Assessment
@@ -44,11 +36,8 @@ def backfill(zillow, zpid, **kwargs):
     - zestimate
     """
     try:
-        response = zillow.get("https://www.zillow.com/graphql/", params=params, headers=headers)
-        if response.status_code != 200:
-            raise Exception(response.text)
-        data = response.json()
-        home_info = data.get("data").get("property")
+        response, data = zillow.graphql.fetch_property(zpid, PROPERTY_FIELDS, headers=headers)
+        home_info = property_payload(response, data)
         lot_area_unit = home_info.get("lotAreaUnit")
         tax_history = home_info.get("taxHistory") or []
         tax_assessment = tax_history[0].get("value") if tax_history else None
@@ -227,7 +216,6 @@ def process_csv(csv_path):
 
             try:
                 # Fetch additional data from Zillow API
-                time.sleep(randint(1, 3))
                 api_data = backfill(zillow, zpid, url=url)
 
                 # Build the home record combining CSV data and API data
@@ -0,0 +1,21 @@
+-- City registry for the Zillow crawler and the stats its scheduler uses.
+-- Times are epoch seconds.
+CREATE TABLE crawl_cities (
+    city TEXT PRIMARY KEY,
+    enabled BOOLEAN NOT NULL DEFAULT TRUE,
+    runs INTEGER NOT NULL DEFAULT 0,
+    new_rows_per_hour DOUBLE PRECISION,
+    interval_hours DOUBLE PRECISION,
+    last_run_at DOUBLE PRECISION,
+    last_change_at DOUBLE PRECISION,
+    next_run_at DOUBLE PRECISION
+);
+
+CREATE INDEX idx_crawl_cities_next_run_at ON crawl_cities(next_run_at);
+
+INSERT INTO crawl_cities (city) VALUES
+    ('Collingswood'),
+    ('Haddonfield'),
+    ('Haddon_Township'),
+    ('Moorestown')
+ON CONFLICT (city) DO NOTHING;
@@ -0,0 +1,7 @@
+-- When each zpid's price history was last fetched, so repeats can be skipped.
+-- event_count is the number of records the fetch returned.
+CREATE TABLE price_history_fetch_log (
+    zpid BIGINT PRIMARY KEY,
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    event_count INTEGER NOT NULL DEFAULT 0
+);
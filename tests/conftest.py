@@ -0,0 +1,24 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The price history Lambda imports its modules flat, as they sit in LAMBDA_TASK_ROOT
+for path in (ROOT, os.path.join(ROOT, "aws", "price_history")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+class FakeResponse:
+    """Stand-in for a curl_cffi/requests response."""
+
+    def __init__(self, status_code=200, payload=None, content=b"", headers=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.content = content
+        self.headers = headers or {}
+
+    def json(self):
+        if self._payload is None:
+            raise ValueError("not JSON")
+        return self._payload
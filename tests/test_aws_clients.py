@@ -0,0 +1,60 @@
+import threading
+
+import psycopg2
+import pytest
+
+from crawler import aws_clients
+
+
+class FakeConnection:
+    def __init__(self, **kwargs):
+        self.closed = 0
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture(autouse=True)
+def fake_db(monkeypatch):
+    for name, value in (("DB_USER", "u"), ("DB_HOST", "h"), ("DB_PASSWORD", "p")):
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(psycopg2, "connect", FakeConnection)
+    monkeypatch.setattr(aws_clients, "_DB_CONNECTIONS", {})
+
+
+def _in_thread(fn):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_connection_is_reused_on_the_same_thread():
+    assert aws_clients.db_connection() is aws_clients.db_connection()
+
+
+def test_threads_get_their_own_connection():
+    conn = aws_clients.db_connection()
+    assert _in_thread(aws_clients.db_connection) is not conn
+
+
+def test_connections_of_exited_threads_are_closed():
+    dead = _in_thread(aws_clients.db_connection)
+    assert not dead.closed
+    aws_clients.db_connection()
+    assert dead.closed
+    assert len(aws_clients._DB_CONNECTIONS) == 1
+
+
+def test_closed_connection_is_replaced():
+    conn = aws_clients.db_connection()
+    conn.close()
+    assert aws_clients.db_connection() is not conn
+
+
+def test_discard_forgets_connection():
+    conn = aws_clients.db_connection()
+    aws_clients.discard_db_connection(conn)
+    assert conn.closed
+    assert aws_clients.db_connection() is not conn
@@ -0,0 +1,39 @@
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from crawler.city_runner import run_cities
+
+
+def test_failing_city_is_reported_without_stopping_others():
+    def run(city):
+        if city == "Bad":
+            raise ValueError("no session data")
+        return city.lower()
+
+    summary = run_cities(["Good", "Bad"], run, max_workers=2)
+    assert summary["succeeded"] == {"Good": "good"}
+    assert summary["failed"] == {"Bad": "ValueError: no session data"}
+
+
+def test_interrupt_returns_without_waiting_for_running_cities():
+    release = threading.Event()
+    started = []
+
+    def run(city):
+        started.append(city)
+        release.wait(10)
+
+    threading.Timer(0.2, os.kill, (os.getpid(), signal.SIGINT)).start()
+    began = time.monotonic()
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            run_cities(["Running", "Queued"], run, max_workers=1)
+        assert time.monotonic() - began < 5
+        time.sleep(0.1)
+        assert started == ["Running"]
+    finally:
+        release.set()
@@ -0,0 +1,64 @@
+import json
+import multiprocessing
+
+import pytest
+
+from crawler.city_scheduler import (
+    HOUR, CityRegistry, CityScheduler, CityStats, FileCityRegistry, PostgresCityRegistry,
+)
+
+CITIES = [f"City {i}" for i in range(8)]
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "cities.json"
+    path.write_text(json.dumps({"cities": CITIES}))
+    return str(path)
+
+
+def test_busy_city_is_polled_sooner_than_a_quiet_one():
+    scheduler = CityScheduler(min_hours=1, max_hours=100)
+    busy, quiet = CityStats("Busy"), CityStats("Quiet")
+    for stats, new_rows in ((busy, 10), (quiet, 0)):
+        scheduler.record_run(stats, new_rows, now=0)
+        scheduler.record_run(stats, new_rows, now=10 * HOUR)
+    assert busy.interval_hours < quiet.interval_hours
+
+
+def _record(config_path, state_path, city):
+    CityRegistry(FileCityRegistry(config_path, state_path)).record_run(city, 1, now=1000)
+
+
+def test_concurrent_processes_keep_every_citys_stats(config_path, tmp_path):
+    state_path = str(tmp_path / "city_stats.json")
+    processes = [
+        multiprocessing.Process(target=_record, args=(config_path, state_path, city))
+        for city in CITIES
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    stats = FileCityRegistry(config_path, state_path).all()
+    assert [s.runs for s in stats] == [1] * len(CITIES)
+
+
+def test_file_registry_is_refused_on_lambda(config_path, monkeypatch):
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "zillow-scraper")
+    monkeypatch.setenv("CITY_REGISTRY_BACKEND", "file")
+    with pytest.raises(ValueError):
+        CityRegistry.from_env(config_path)
+
+
+def test_lambda_defaults_to_postgres_registry(config_path, monkeypatch):
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "zillow-scraper")
+    monkeypatch.delenv("CITY_REGISTRY_BACKEND", raising=False)
+    assert isinstance(CityRegistry.from_env(config_path).store, PostgresCityRegistry)
+
+
+def test_local_runs_default_to_file_registry(config_path, monkeypatch):
+    monkeypatch.delenv("AWS_LAMBDA_FUNCTION_NAME", raising=False)
+    monkeypatch.delenv("CITY_REGISTRY_BACKEND", raising=False)
+    assert isinstance(CityRegistry.from_env(config_path).store, FileCityRegistry)
@@ -0,0 +1,62 @@
+import pytest
+
+from conftest import FakeResponse
+from crawler import concurrency
+from crawler.concurrency import AIMDController, ZillowBlockDetector
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(concurrency.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _complete(controller, **outcome):
+    controller.acquire()
+    controller.release(**outcome)
+
+
+def test_healthy_responses_grow_the_limit_up_to_max(clock):
+    controller = AIMDController(initial_concurrency=2, max_concurrency=4)
+    for _ in range(100):
+        _complete(controller)
+    assert controller.concurrency == 4
+
+
+def test_block_halves_the_limit(clock):
+    controller = AIMDController(initial_concurrency=8, max_concurrency=8)
+    _complete(controller, blocked=True)
+    assert controller.concurrency == 4
+    metrics = controller.metrics()
+    assert (metrics["blocks"], metrics["block_rate"], metrics["in_flight"]) == (1, 1.0, 0)
+
+
+def test_burst_of_blocks_within_cooldown_cuts_once(clock):
+    controller = AIMDController(initial_concurrency=8, max_concurrency=8, cooldown=5)
+    for _ in range(3):
+        _complete(controller, blocked=True)
+    assert controller.concurrency == 4
+
+    clock[0] += 5
+    _complete(controller, error=True)
+    assert controller.concurrency == 2
+
+
+def test_limit_never_drops_below_min(clock):
+    controller = AIMDController(min_concurrency=2, initial_concurrency=2, cooldown=0)
+    for _ in range(5):
+        _complete(controller, blocked=True)
+    assert controller.concurrency == 2
+
+
+def test_zillow_block_detector():
+    detector = ZillowBlockDetector()
+    assert detector.is_blocked(FakeResponse(403))
+    assert detector.is_blocked(FakeResponse(429))
+    assert detector.is_blocked(FakeResponse(200, content=b'<div id="px-captcha"></div>'))
+    assert detector.is_blocked(FakeResponse(200, content=b'{"appId":"PX","blockScript":"/b.js"}'))
+    # Normal pages load the PerimeterX sensor too
+    page = b'<script>window._pxAppId = "PXHYx10rg3";</script><!-- perimeterx -->'
+    assert not detector.is_blocked(FakeResponse(200, content=page))
+    assert not detector.is_blocked(FakeResponse(500))
@@ -0,0 +1,92 @@
+import builtins
+
+import pytest
+from lxml import html
+
+from crawler.utils.extraction_schema import ExtractionSchema, Field
+
+PAGE = html.fromstring("""
+<html><body>
+  <article class="card"><address>1 Main St</address><span class="price">$300,000</span>
+    <span class="beds">3</span><a href="/homes/1">home</a></article>
+  <article class="card"><address>2 Main St</address><span class="price">n/a</span>
+    <a href="/homes/2">home</a></article>
+  <footer><address>Zillow HQ</address></footer>
+</body></html>
+""")
+
+
+def parse_price(value):
+    return float(value.replace("$", "").replace(",", ""))
+
+
+def test_root_selects_one_record_per_card():
+    schema = ExtractionSchema({"address": ".//address"}, root="//article[@class='card']")
+    assert schema.extract(PAGE) == {"address": ["1 Main St", "2 Main St"]}
+
+
+def test_without_root_each_page_is_one_record():
+    schema = ExtractionSchema({"address": "//address"})
+    assert schema.extract_many([PAGE, PAGE]) == {"address": ["1 Main St", "1 Main St"]}
+
+
+def test_converters_attrs_and_defaults():
+    schema = ExtractionSchema(
+        {
+            "price": Field(".//span[@class='price']", converter=parse_price, default=-1),
+            "url": Field(".//a", attr="href"),
+            "beds": Field(".//span[@class='beds']/text()", converter=int, default=0),
+        },
+        root="//article",
+    )
+    # An unparsable price and a missing beds span both fall back to the default
+    assert schema.extract(PAGE) == {"price": [300000.0, -1], "url": ["/homes/1", "/homes/2"], "beds": [3, 0]}
+
+
+def test_missing_field_is_none_by_default():
+    schema = ExtractionSchema({"sqft": ".//span[@class='sqft']"}, root="//article")
+    assert schema.extract(PAGE) == {"sqft": [None, None]}
+
+
+def test_css_selectors():
+    pytest.importorskip("cssselect")
+    schema = ExtractionSchema({"price": Field("span.price", css=True)}, root="//article")
+    assert schema.extract(PAGE)["price"] == ["$300,000", "n/a"]
+
+
+def test_as_numpy_converts_numeric_columns():
+    np = pytest.importorskip("numpy")
+    schema = ExtractionSchema(
+        {
+            "address": ".//address",
+            # numeric is only inferred for int/float converters
+            "price": Field(".//span[@class='price']", converter=parse_price, numeric=True),
+            "beds": Field(".//span[@class='beds']", converter=int),
+            "baths": Field(".//span[@class='beds']", converter=int, default=0),
+        },
+        root="//article",
+    )
+    columns = schema.extract(PAGE, as_numpy=True)
+    assert columns["address"] == ["1 Main St", "2 Main St"]
+    assert columns["price"].dtype == float and np.isnan(columns["price"][1])
+    # An int column with a missing value becomes float so it can hold NaN
+    assert columns["beds"].dtype == float and np.isnan(columns["beds"][1])
+    assert columns["baths"].dtype == int and list(columns["baths"]) == [3, 0]
+
+
+@pytest.mark.parametrize("module", ["numpy", "cssselect"])
+def test_missing_optional_dependency_raises_without_chaining(monkeypatch, module):
+    real_import = builtins.__import__
+
+    def fake_import(name, *args, **kwargs):
+        if name == module:
+            raise ImportError(f"No module named {module!r}")
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", fake_import)
+    with pytest.raises(ImportError, match=f"pip install {module}") as error:
+        if module == "numpy":
+            ExtractionSchema({"beds": Field(".//span", converter=int)}).extract(PAGE, as_numpy=True)
+        else:
+            Field("span.price", css=True)
+    assert error.value.__cause__ is None and error.value.__suppress_context__
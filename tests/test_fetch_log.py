@@ -0,0 +1,129 @@
+import json
+
+import psycopg2.extras
+import pytest
+
+import handler
+from conftest import FakeResponse
+from fetch_log import FetchLog
+from price_history_fetcher import PriceHistoryFetcher
+
+TTL = 3600
+
+
+class FakeTable:
+    """price_history_fetch_log behind a fake psycopg2 connection."""
+
+    def __init__(self, rows=None):
+        self.rows = dict(rows or {})
+        self.selects = 0
+        self._result = []
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        self.selects += 1
+        (zpids,) = params
+        self._result = [(zpid, *self.rows[zpid]) for zpid in zpids if zpid in self.rows]
+
+    def fetchall(self):
+        return self._result
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeTable()
+
+    def execute_values(cur, sql, values, template=None):
+        for zpid, fetched_at, count in values:
+            table.rows[zpid] = (fetched_at, count)
+
+    monkeypatch.setattr(psycopg2.extras, "execute_values", execute_values)
+    return table
+
+
+def test_recorded_zpids_are_fresh_until_the_ttl(table):
+    log = FetchLog(lambda: table, ttl=TTL)
+    log.record({1: 3}, now=1000)
+    assert log.fresh([1, 2], now=1000 + TTL - 1) == {1}
+    assert log.fresh([1], now=1000 + TTL) == set()
+
+
+def test_fresh_answers_come_from_memory(table):
+    log = FetchLog(lambda: table, ttl=TTL)
+    log.record({1: 3}, now=1000)
+    assert log.fresh([1], now=1001) == {1}
+    assert table.selects == 0
+    assert log.stats() == {"memory_hits": 1, "lookups": 0}
+
+
+def test_fetches_by_other_instances_are_read_from_the_table(table):
+    table.rows[1] = (1000, 3)
+    log = FetchLog(lambda: table, ttl=TTL)
+    assert log.fresh([1, 2], now=1001) == {1}
+    assert log.fresh([1], now=1002) == {1}
+    assert table.selects == 1
+
+
+def test_lru_keeps_max_size_entries(table):
+    log = FetchLog(lambda: table, ttl=TTL, max_size=2)
+    log.record({1: 1, 2: 1, 3: 1}, now=1000)
+    table.rows.clear()
+    assert log.fresh([1, 2, 3], now=1001) == {2, 3}
+
+
+def test_lookup_failure_means_not_fresh():
+    def connect():
+        raise psycopg2.OperationalError("down")
+
+    assert FetchLog(connect, ttl=TTL).fresh([1]) == set()
+
+
+def test_zero_ttl_disables_skipping(table):
+    log = FetchLog(lambda: table, ttl=0)
+    log.record({1: 1})
+    assert log.fresh([1]) == set()
+
+
+class FakeGraphQL:
+    def __init__(self, response):
+        self.response = response
+
+    def fetch_property(self, zpid, fields, **kwargs):
+        return self.response, self.response._payload
+
+
+@pytest.mark.parametrize("response", [
+    FakeResponse(403),
+    FakeResponse(200, {"data": {"property": None}}),
+    FakeResponse(200, {"errors": [{"message": "boom"}]}),
+    FakeResponse(200, payload=None),
+])
+def test_blocked_or_empty_response_is_failed_and_not_recorded(table, monkeypatch, response):
+    fetcher = PriceHistoryFetcher.__new__(PriceHistoryFetcher)
+    fetcher.blocked = False
+    fetcher.batches_supported = True
+    fetcher.graphql = FakeGraphQL(response)
+    log = FetchLog(lambda: table, ttl=TTL)
+    monkeypatch.setattr(handler.PriceHistoryFetcher, "pooled", classmethod(lambda cls, **kwargs: fetcher))
+    monkeypatch.setattr(handler, "FETCH_LOG", log)
+    monkeypatch.setattr(handler, "PRICE_HISTORY_WORKERS", 1)
+
+    event = {"Records": [{"messageId": "m0", "body": json.dumps({"zpid": 1})}]}
+    result = handler.lambda_handler(event, None)
+    assert result["batchItemFailures"] == [{"itemIdentifier": "m0"}]
+    assert table.rows == {}
+    assert log.fresh([1]) == set()
@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+import handler
+
+
+class FakeFetcher:
+    """Fetches every zpid except those in fail; blocks once it reaches block_at."""
+
+    def __init__(self, fail=(), block_at=None):
+        self.fail = set(fail)
+        self.block_at = block_at
+        self.blocked = False
+        self.batches_supported = True
+        self.requested = []
+
+    def get_price_histories(self, zpids, deadline=None):
+        results = {}
+        for i, zpid in enumerate(zpids):
+            if zpid == self.block_at:
+                self.blocked = True
+                return results, zpids[i + 1:]
+            self.requested.append(zpid)
+            if zpid not in self.fail:
+                results[zpid] = [{"zpid": zpid, "event": "Sold"}]
+        return results, []
+
+
+class FakeFetchLog:
+    def __init__(self, fresh=()):
+        self._fresh = set(fresh)
+        self.recorded = {}
+
+    def fresh(self, zpids):
+        return {zpid for zpid in zpids if zpid in self._fresh}
+
+    def record(self, event_counts):
+        self.recorded.update(event_counts)
+
+    def stats(self):
+        return {}
+
+
+class FakeContext:
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+@pytest.fixture
+def lambda_env(monkeypatch):
+    env = type("Env", (), {})()
+    env.fetcher = FakeFetcher()
+    env.fetch_log = FakeFetchLog()
+    env.rejected = set()
+    env.saved = {}
+
+    def save(histories):
+        env.saved.update(histories)
+        return {zpid: len(records) for zpid, records in histories.items() if zpid not in env.rejected}
+
+    monkeypatch.setattr(handler.PriceHistoryFetcher, "pooled", classmethod(lambda cls, **kwargs: env.fetcher))
+    monkeypatch.setattr(handler, "save_price_histories", save)
+    monkeypatch.setattr(handler, "FETCH_LOG", env.fetch_log)
+    monkeypatch.setattr(handler, "PRICE_HISTORY_WORKERS", 1)
+    return env
+
+
+def _event(*bodies):
+    return {"Records": [
+        {"messageId": f"m{i}", "body": body if isinstance(body, str) else json.dumps(body)}
+        for i, body in enumerate(bodies)
+    ]}
+
+
+def _failures(result):
+    return sorted(item["itemIdentifier"] for item in result["batchItemFailures"])
+
+
+def test_all_processed_reports_no_failures(lambda_env):
+    result = handler.lambda_handler(_event({"zpid": 1}, {"zpid": 2}), None)
+    assert _failures(result) == []
+    assert sorted(lambda_env.saved) == [1, 2]
+    assert lambda_env.fetch_log.recorded == {1: 1, 2: 1}
+
+
+def test_duplicates_are_fetched_once_and_bad_bodies_fail_alone(lambda_env):
+    result = handler.lambda_handler(_event({"zpid": 1}, {"zpid": "1"}, "not json", {"id": 2}), None)
+    assert _failures(result) == ["m2", "m3"]
+    assert lambda_env.fetcher.requested == [1]
+
+
+def test_failed_fetch_fails_every_message_of_its_zpid(lambda_env):
+    lambda_env.fetcher = FakeFetcher(fail={2})
+    result = handler.lambda_handler(_event({"zpid": 1}, {"zpid": 2}, {"zpid": 2}), None)
+    assert _failures(result) == ["m1", "m2"]
+    assert 2 not in lambda_env.fetch_log.recorded
+
+
+def test_rejected_insert_fails_its_zpid(lambda_env):
+    lambda_env.rejected = {1}
+    result = handler.lambda_handler(_event({"zpid": 1}, {"zpid": 2}), None)
+    assert _failures(result) == ["m0"]
+    assert lambda_env.fetch_log.recorded == {2: 1}
+
+
+def test_fresh_zpids_are_skipped_unless_forced(lambda_env):
+    lambda_env.fetch_log._fresh = {1, 2}
+    result = handler.lambda_handler(_event({"zpid": 1}, {"zpid": 2, "force": True}), None)
+    assert _failures(result) == []
+    assert lambda_env.fetcher.requested == [2]
+
+
+def test_nothing_starts_inside_the_time_reserve(lambda_env, monkeypatch):
+    monkeypatch.setattr(handler, "PRICE_HISTORY_TIME_RESERVE_MS", 15000)
+    result = handler.lambda_handler(_event({"zpid": 1}, {"zpid": 2}), FakeContext(10000))
+    assert _failures(result) == ["m0", "m1"]
+    assert lambda_env.fetcher.requested == []
+
+
+def test_blocked_worker_releases_its_remaining_zpids(lambda_env):
+    lambda_env.fetcher = FakeFetcher(block_at=2)
+    result = handler.lambda_handler(_event({"zpid": 1}, {"zpid": 2}, {"zpid": 3}), None)
+    # 2 was blocked, 3 never started
+    assert _failures(result) == ["m1", "m2"]
+    assert lambda_env.fetch_log.recorded == {1: 1}
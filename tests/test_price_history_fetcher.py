@@ -0,0 +1,125 @@
+import pytest
+
+from conftest import FakeResponse
+from price_history_fetcher import PriceHistoryFetcher
+
+
+def _history(zpid):
+    return {"zpid": zpid, "priceHistory": [{"event": "Sold", "price": 100, "time": 1, "date": "2024-01-01"}]}
+
+
+class FakeGraphQL:
+    """Answers batched queries with batch(zpids) and single ones with single(zpid)."""
+
+    def __init__(self, batch=None, single=None):
+        self.batch = batch
+        self.single = single or (lambda zpid: FakeResponse(200, {"data": {"property": _history(zpid)}}))
+        self.batches = []
+        self.singles = []
+
+    def execute(self, query, variables, **kwargs):
+        zpids = list(variables.values())
+        self.batches.append(zpids)
+        response = self.batch(zpids)
+        return response, response._payload
+
+    def fetch_property(self, zpid, fields, **kwargs):
+        self.singles.append(zpid)
+        response = self.single(zpid)
+        return response, response._payload
+
+
+def _fetcher(graphql):
+    fetcher = PriceHistoryFetcher.__new__(PriceHistoryFetcher)
+    fetcher.blocked = False
+    fetcher.batches_supported = True
+    fetcher.graphql = graphql
+    return fetcher
+
+
+def test_batch_returns_every_resolved_property():
+    graphql = FakeGraphQL(batch=lambda zpids: FakeResponse(200, {"data": {
+        f"p{i}": _history(zpid) for i, zpid in enumerate(zpids)
+    }}))
+    histories, unstarted = _fetcher(graphql).get_price_histories([1, 2, 3], batch_size=3)
+    assert sorted(histories) == [1, 2, 3]
+    assert histories[2][0]["price"] == 100
+    assert (unstarted, graphql.singles) == ([], [])
+
+
+def test_unresolved_aliases_fall_back_to_single_requests():
+    graphql = FakeGraphQL(batch=lambda zpids: FakeResponse(200, {"data": {"p0": _history(zpids[0]), "p1": None}}))
+    fetcher = _fetcher(graphql)
+    histories, _ = fetcher.get_price_histories([1, 2], batch_size=2)
+    assert sorted(histories) == [1, 2]
+    assert graphql.singles == [2]
+    assert fetcher.batches_supported
+
+
+def test_rejected_document_disables_batching():
+    graphql = FakeGraphQL(batch=lambda zpids: FakeResponse(200, {"errors": [{"message": "Validation error"}]}))
+    fetcher = _fetcher(graphql)
+    histories, _ = fetcher.get_price_histories([1, 2, 3, 4], batch_size=2)
+    assert sorted(histories) == [1, 2, 3, 4]
+    assert not fetcher.batches_supported
+    assert graphql.batches == [[1, 2]]
+
+
+def test_rejected_document_with_400_disables_batching():
+    # Apollo answers a document it can't validate with a 400 and errors
+    graphql = FakeGraphQL(batch=lambda zpids: FakeResponse(400, {"errors": [{"message": "Cannot query field"}]}))
+    fetcher = _fetcher(graphql)
+    histories, _ = fetcher.get_price_histories([1, 2, 3, 4], batch_size=2)
+    assert sorted(histories) == [1, 2, 3, 4]
+    assert not fetcher.batches_supported
+    assert graphql.batches == [[1, 2]]
+
+
+@pytest.mark.parametrize("response", [
+    FakeResponse(503),
+    FakeResponse(503, {"errors": [{"message": "upstream"}]}),
+    FakeResponse(200, payload=None),
+])
+def test_transient_batch_failure_falls_back_for_the_chunk(response):
+    graphql = FakeGraphQL(batch=lambda zpids: response)
+    fetcher = _fetcher(graphql)
+    histories, unstarted = fetcher.get_price_histories([1, 2, 3, 4], batch_size=2)
+    assert (sorted(histories), unstarted) == ([1, 2, 3, 4], [])
+    assert graphql.singles == [1, 2, 3, 4]
+    # Later chunks still try a batch first
+    assert graphql.batches == [[1, 2], [3, 4]]
+    assert fetcher.batches_supported
+
+
+def test_blocked_batch_returns_its_zpids_unstarted():
+    graphql = FakeGraphQL(batch=lambda zpids: FakeResponse(403))
+    fetcher = _fetcher(graphql)
+    histories, unstarted = fetcher.get_price_histories([1, 2, 3], batch_size=2)
+    assert (histories, unstarted, graphql.singles) == ({}, [1, 2, 3], [])
+    assert fetcher.blocked
+
+
+@pytest.mark.parametrize("response", [
+    FakeResponse(200, {"data": {"property": None}}),
+    FakeResponse(200, {"errors": [{"message": "boom"}], "data": None}),
+    FakeResponse(200, payload=None),
+    FakeResponse(500),
+])
+def test_empty_or_failed_single_response_is_left_out(response):
+    fetcher = _fetcher(FakeGraphQL(single=lambda zpid: response))
+    histories, unstarted = fetcher.get_price_histories([1], batch_size=1)
+    assert (histories, unstarted) == ({}, [])
+
+
+def test_block_stops_and_returns_unstarted_zpids():
+    fetcher = _fetcher(FakeGraphQL(single=lambda zpid: FakeResponse(403)))
+    histories, unstarted = fetcher.get_price_histories([1, 2, 3], batch_size=1)
+    assert histories == {}
+    assert unstarted == [2, 3]
+    assert fetcher.blocked
+
+
+def test_passed_deadline_starts_nothing():
+    graphql = FakeGraphQL()
+    histories, unstarted = _fetcher(graphql).get_price_histories([1, 2], batch_size=1, deadline=0)
+    assert (histories, unstarted, graphql.singles) == ({}, [1, 2], [])
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from crawler import rate_limiter
+from crawler.async_crawler import AsyncCrawler
+from crawler.rate_limiter import FileTokenBucket, RateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    monkeypatch.setattr(rate_limiter.time, "time", clock)
+    return clock
+
+
+def test_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_full_bucket_allows_a_burst_then_queues(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    # Each further caller waits behind the previous one
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(rate=1, capacity=2)
+    bucket.reserve()
+    bucket.reserve()
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(2)] == [0, 0]
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_file_bucket_is_shared_through_its_file(clock, tmp_path):
+    path = str(tmp_path / "zillow")
+    first = FileTokenBucket(path, rate=1, capacity=1)
+    second = FileTokenBucket(path, rate=1, capacity=1)
+    assert first.reserve() == 0
+    assert second.reserve() == pytest.approx(1.0)
+
+
+def test_limiter_keeps_one_bucket_per_host():
+    limiter = RateLimiter(rate=1, host_limits={"www.zillow.com": (0.5, 2)})
+    zillow = limiter.bucket("https://www.zillow.com/graphql/")
+    assert limiter.bucket("https://www.zillow.com/homes/") is zillow
+    assert (zillow.rate, zillow.capacity) == (0.5, 2)
+    other = limiter.bucket("https://example.com/")
+    assert other is not zillow
+    assert (other.rate, other.capacity) == (1, 1)
+
+
+def test_from_env_rejects_unknown_backend(monkeypatch):
+    monkeypatch.setenv("CRAWLER_RATE_LIMIT_BACKEND", "redis")
+    with pytest.raises(ValueError):
+        RateLimiter.from_env(1)
+
+
+def test_async_crawler_reserves_file_buckets_off_the_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setenv("CRAWLER_RATE_LIMIT_BACKEND", "file")
+    monkeypatch.setenv("CRAWLER_RATE_LIMIT_DIR", str(tmp_path))
+    reserve = FileTokenBucket.reserve
+    threads = []
+
+    def recording_reserve(self, tokens=1):
+        threads.append(threading.get_ident())
+        return reserve(self, tokens)
+
+    monkeypatch.setattr(FileTokenBucket, "reserve", recording_reserve)
+
+    async def crawl():
+        limiter = RateLimiter.from_env(rate=100, capacity=10, name="test")
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, text="<p>ok</p>"))
+        async with AsyncCrawler(rate_limiter=limiter, transport=transport) as crawler:
+            await crawler.get_all(["https://example.com/a", "https://example.com/b"])
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(crawl())
+    assert len(threads) == 2
+    assert loop_thread not in threads
@@ -0,0 +1,115 @@
+import asyncio
+
+import httpx
+import pytest
+import requests
+
+from conftest import FakeResponse
+from crawler.async_crawler import AsyncCrawler
+from crawler.crawler import Crawler
+from crawler.retry import RetryBudget, RetryPolicy, parse_retry_after
+
+
+def test_non_retryable_status_gives_up():
+    policy = RetryPolicy(budget=None)
+    assert policy.retry_delay(0, "example.com", response=FakeResponse(403)) is None
+    assert policy.retry_delay(0, "example.com", response=FakeResponse(404)) is None
+
+
+def test_retryable_status_backs_off_within_cap():
+    policy = RetryPolicy(base_delay=2.0, max_delay=5.0, budget=None)
+    for attempt in range(6):
+        delay = policy.retry_delay(attempt, "example.com", response=FakeResponse(503))
+        assert 0 <= delay <= min(5.0, 2.0 * 2**attempt)
+
+
+def test_transient_exception_is_retried():
+    policy = RetryPolicy(budget=None)
+    assert policy.retry_delay(0, "example.com", exception=ConnectionError()) is not None
+    assert policy.retry_delay(0, "example.com", exception=ValueError()) is None
+
+
+def test_retry_after_overrides_backoff():
+    policy = RetryPolicy(max_delay=60.0, budget=None)
+    response = FakeResponse(429, headers={"retry-after": "7"})
+    assert policy.retry_delay(0, "example.com", response=response) == 7.0
+
+
+def test_retry_after_beyond_max_delay_gives_up():
+    policy = RetryPolicy(max_delay=10.0, budget=None)
+    response = FakeResponse(429, headers={"retry-after": "120"})
+    assert policy.retry_delay(0, "example.com", response=response) is None
+
+
+def test_budget_caps_retries_per_host():
+    budget = RetryBudget(ratio=0.5, min_retries=1)
+    policy = RetryPolicy(budget=budget)
+    for _ in range(4):
+        policy.record_request("a.example.com")
+
+    # min_retries + ratio * 4 requests = 3 retries
+    delays = [policy.retry_delay(0, "a.example.com", response=FakeResponse(503)) for _ in range(4)]
+    assert [delay is not None for delay in delays] == [True, True, True, False]
+    # Other hosts have their own budget
+    assert policy.retry_delay(0, "b.example.com", response=FakeResponse(503)) is not None
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after(" 30 ") == 30.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+class CountingSession:
+    """Stands in for requests.Session, answering every request with status."""
+
+    def __init__(self, status):
+        self.status = status
+        self.calls = 0
+
+    def request(self, session, method, url, *args, **kwargs):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = self.status
+        response.url = url
+        response._content = b""
+        return response
+
+
+def test_explicit_max_retries_overrides_the_policy(monkeypatch):
+    send = CountingSession(503)
+    monkeypatch.setattr(requests.Session, "request", lambda *args, **kwargs: send.request(*args, **kwargs))
+    crawler = Crawler(retry_policy=RetryPolicy(max_retries=5, base_delay=0, budget=None))
+    with pytest.raises(Exception, match="HTTP 503"):
+        crawler.get("https://example.com/", max_retries=1)
+    assert send.calls == 1
+
+
+def test_zero_max_retries_raises_without_sending(monkeypatch):
+    send = CountingSession(200)
+    monkeypatch.setattr(requests.Session, "request", lambda *args, **kwargs: send.request(*args, **kwargs))
+    crawler = Crawler(retry_policy=RetryPolicy(budget=None))
+    with pytest.raises(ValueError):
+        crawler.get("https://example.com/", max_retries=0)
+    assert send.calls == 0
+
+
+def test_async_crawler_honours_explicit_max_retries():
+    calls = []
+
+    def respond(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    async def crawl(max_retries):
+        policy = RetryPolicy(max_retries=5, base_delay=0, budget=None)
+        async with AsyncCrawler(retry_policy=policy, transport=httpx.MockTransport(respond)) as crawler:
+            await crawler.get("https://example.com/", max_retries=max_retries)
+
+    with pytest.raises(Exception, match="HTTP 503"):
+        asyncio.run(crawl(1))
+    assert len(calls) == 1
+    with pytest.raises(ValueError):
+        asyncio.run(crawl(0))
+    assert len(calls) == 1
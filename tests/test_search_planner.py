@@ -0,0 +1,94 @@
+import math
+import threading
+
+import pytest
+
+from crawler.search_planner import ZillowSearchPlanner, split_bounds
+from crawler.zillow_records import (
+    Cat1, HdpData, HomeInfo, SearchList, SearchResponse, SearchResults, SoldHome,
+)
+
+BOUNDS = {"north": 40.0, "south": 39.0, "west": -75.0, "east": -74.0}
+
+
+class FakeSearch:
+    """Search endpoint over homes at fixed points, page_size results per page."""
+
+    def __init__(self, points, page_size=2):
+        self.points = points
+        self.page_size = page_size
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def __call__(self, data):
+        with self.lock:
+            self.calls += 1
+        state = data["searchQueryState"]
+        bounds = state["mapBounds"]
+        inside = [
+            zpid for zpid, (lat, lng) in sorted(self.points.items())
+            if bounds["south"] <= lat <= bounds["north"] and bounds["west"] <= lng <= bounds["east"]
+        ]
+        page = state.get("pagination", {}).get("currentPage", 1)
+        start = (page - 1) * self.page_size
+        homes = [
+            SoldHome(hdp_data=HdpData(home_info=HomeInfo(zpid=zpid)))
+            for zpid in inside[start:start + self.page_size]
+        ]
+        return SearchResponse(cat1=Cat1(
+            search_list=SearchList(total_pages=math.ceil(len(inside) / self.page_size)),
+            search_results=SearchResults(list_results=homes),
+        ))
+
+
+def _search(bounds=BOUNDS):
+    return {"searchQueryState": {"mapBounds": dict(bounds), "pagination": {}}}
+
+
+def test_split_bounds_covers_parent():
+    quadrants = split_bounds(BOUNDS)
+    assert len(quadrants) == 4
+    assert {q["north"] for q in quadrants} == {40.0, 39.5}
+    assert {q["west"] for q in quadrants} == {-75.0, -74.5}
+
+
+def test_single_page_search_is_not_split():
+    fetch = FakeSearch({1: (39.2, -74.8), 2: (39.8, -74.2)})
+    planner = ZillowSearchPlanner(fetch)
+    assert [home.zpid for home in planner.fetch(_search())] == [1, 2]
+    assert planner.tiles_fetched == fetch.calls == 1
+
+
+def test_overflowing_search_is_tiled_until_each_tile_fits():
+    # One home per quadrant, plus a cluster in the NW quadrant that needs another split
+    points = {1: (39.2, -74.8), 2: (39.2, -74.2), 3: (39.8, -74.2),
+              4: (39.9, -74.9), 5: (39.9, -74.6), 6: (39.6, -74.9)}
+    fetch = FakeSearch(points)
+    planner = ZillowSearchPlanner(fetch, max_workers=4)
+    homes = planner.fetch(_search())
+    assert sorted(home.zpid for home in homes) == sorted(points)
+    # root, four quadrants, then the four children of the NW quadrant
+    assert planner.tiles_fetched == fetch.calls == 9
+
+
+def test_tiles_at_max_depth_fall_back_to_paging():
+    # Five homes on one spot can never be split apart
+    points = {zpid: (39.9, -74.9) for zpid in range(1, 6)}
+    fetch = FakeSearch(points)
+    planner = ZillowSearchPlanner(fetch, max_depth=1)
+    homes = planner.fetch(_search())
+    assert sorted(home.zpid for home in homes) == [1, 2, 3, 4, 5]
+
+
+def test_homes_on_tile_borders_are_deduplicated():
+    # On the midlines, so every quadrant touching them returns them
+    points = {1: (39.5, -74.5), 2: (39.5, -74.5), 3: (39.5, -74.5)}
+    planner = ZillowSearchPlanner(FakeSearch(points), max_depth=1)
+    assert sorted(home.zpid for home in planner.fetch(_search())) == [1, 2, 3]
+
+
+def test_overflowing_search_without_bounds_raises():
+    fetch = FakeSearch({zpid: (39.5, -74.5) for zpid in range(3)})
+    planner = ZillowSearchPlanner(lambda data: fetch(_search()))
+    with pytest.raises(Exception):
+        planner.fetch({"searchQueryState": {}})
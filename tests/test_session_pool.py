@@ -0,0 +1,71 @@
+import pytest
+
+from crawler import session_pool
+from crawler.session_pool import SessionPool
+
+
+class FakeSession:
+    def __init__(self):
+        self.blocked = False
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_pool.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_reuses_warm_session(clock):
+    pool = SessionPool()
+    session = pool.get("zillow", FakeSession)
+    assert pool.get("zillow", FakeSession) is session
+    assert pool.stats() == {"size": 1, "hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_evicts_idle_session(clock):
+    pool = SessionPool(max_idle=60)
+    session = pool.get("zillow", FakeSession)
+    clock[0] += 61
+    assert pool.get("zillow", FakeSession) is not session
+    assert session.closed
+
+
+def test_evicts_old_session_even_when_busy(clock):
+    pool = SessionPool(max_idle=60, max_age=100)
+    session = pool.get("zillow", FakeSession)
+    for _ in range(3):
+        clock[0] += 40
+        pool.get("zillow", FakeSession)
+    assert session.closed
+
+
+def test_evicts_blocked_session(clock):
+    pool = SessionPool()
+    session = pool.get("zillow", FakeSession)
+    session.blocked = True
+    assert pool.get("zillow", FakeSession) is not session
+    assert session.closed
+
+
+def test_evicts_least_recently_used_over_max_size(clock):
+    pool = SessionPool(max_size=2)
+    a = pool.get("a", FakeSession)
+    b = pool.get("b", FakeSession)
+    pool.get("a", FakeSession)
+    pool.get("c", FakeSession)
+    assert b.closed and not a.closed
+    assert pool.stats()["size"] == 2
+
+
+def test_discard_closes_session(clock):
+    pool = SessionPool()
+    session = pool.get("zillow", FakeSession)
+    pool.discard("zillow")
+    pool.discard("missing")
+    assert session.closed
+    assert pool.stats()["size"] == 0
@@ -0,0 +1,73 @@
+import pytest
+
+from aws.zillow import zillow
+from crawler.sync_state import CitySyncState, SyncStateStore
+from crawler.zillow_records import HdpData, HomeInfo, SoldHome
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+def _home(street, date_sold, zpid=None):
+    return SoldHome(
+        address_city="Moorestown",
+        address_street=street,
+        address_state="NJ",
+        hdp_data=HdpData(home_info=HomeInfo(zpid=zpid, date_sold=date_sold)),
+    )
+
+
+def test_recorded_homes_are_filtered_out():
+    state = CitySyncState()
+    old, new = _home("1 Main St", 100 * DAY_MS), _home("2 Main St", 101 * DAY_MS)
+    state.record([old], CitySyncState.digest([old]))
+    assert state.filter_new([old, new]) == [new]
+    assert state.max_date_sold == 100 * DAY_MS
+
+
+def test_homes_before_the_retention_window_are_dropped():
+    state = CitySyncState(max_date_sold=400 * DAY_MS)
+    stale, recent = _home("1 Main St", 100 * DAY_MS), _home("2 Main St", 390 * DAY_MS)
+    assert state.filter_new([stale, recent], retention_ms=180 * DAY_MS) == [recent]
+
+
+def test_digest_ignores_order():
+    homes = [_home("1 Main St", 1), _home("2 Main St", 2)]
+    assert CitySyncState.digest(homes) == CitySyncState.digest(homes[::-1])
+
+
+def test_store_persists_state_across_instances(tmp_path):
+    home = _home("1 Main St", 100 * DAY_MS)
+    state = CitySyncState()
+    state.record([home], "digest")
+    SyncStateStore(str(tmp_path)).save("Moorestown", state)
+
+    loaded = SyncStateStore(str(tmp_path)).load("Moorestown")
+    assert loaded.result_digest == "digest"
+    assert loaded.filter_new([home]) == []
+
+
+@pytest.fixture
+def city(tmp_path, monkeypatch):
+    monkeypatch.setattr(zillow, "SYNC_STATE", SyncStateStore(str(tmp_path)))
+    crawler = zillow.Zillow.__new__(zillow.Zillow)
+    crawler.city = "Moorestown"
+    return crawler
+
+
+def test_rejected_homes_are_retried_by_the_next_sync(city):
+    stored, rejected = _home("1 Main St", 100 * DAY_MS, 1), _home("2 Main St", 100 * DAY_MS, 2)
+    inserted = []
+
+    def insert_homes(homes):
+        inserted.append(list(homes))
+        if len(inserted) == 1:
+            return [1], [rejected]
+        return [home.zpid for home in homes], []
+
+    city._insert_homes = insert_homes
+    assert city._sync_incremental([stored, rejected]) == [1]
+    # Same result set: the digest mustn't short-circuit the retry
+    assert city._sync_incremental([stored, rejected]) == [2]
+    assert inserted[1] == [rejected]
+    assert city._sync_incremental([stored, rejected]) == []
+    assert len(inserted) == 2
@@ -0,0 +1,56 @@
+import copy
+import pickle
+
+import pytest
+from requests import Response
+
+from crawler.utils.xpath_utils import LazyResponse, bind_custom_html_element
+
+
+def _response(content, content_type=None):
+    response = Response()
+    response.status_code = 200
+    response.url = "https://example.com/"
+    response._content = content
+    if content_type:
+        response.headers["content-type"] = content_type
+    return response
+
+
+@pytest.mark.parametrize("content_type", [
+    "application/json", "text/plain; charset=utf-8", "text/javascript", None,
+])
+def test_json_body_is_decoded_unless_content_type_says_html(content_type):
+    page = bind_custom_html_element(_response(b'{"zpid": 1}', content_type))
+    assert page.json() == {"zpid": 1}
+
+
+def test_html_body_is_never_json_decoded():
+    page = bind_custom_html_element(_response(b'<html><body>{"zpid": 1}</body></html>', "text/html"))
+    assert not page.is_json()
+    assert page.json() == {}
+
+
+def test_invalid_json_decodes_to_empty_dict():
+    assert bind_custom_html_element(_response(b"{not json", "application/json")).json() == {}
+
+
+def test_html_is_parsed_on_first_use():
+    page = bind_custom_html_element(_response(b"<html><body><p>hi</p></body></html>", "text/html"))
+    assert page._element is None
+    assert page.xpath("//p/text()") == ["hi"]
+    assert page._element is not None
+
+
+def test_copy_and_pickle_do_not_recurse():
+    page = bind_custom_html_element(_response(b'{"zpid": 1}', "application/json"))
+    for clone in (copy.copy(page), pickle.loads(pickle.dumps(page))):
+        assert isinstance(clone, LazyResponse)
+        assert clone.json() == {"zpid": 1}
+
+
+def test_private_names_are_not_delegated():
+    page = bind_custom_html_element(_response(b"<p>hi</p>", "text/html"))
+    with pytest.raises(AttributeError):
+        page._missing
+    assert page._element is None